@@ -0,0 +1,90 @@
+"""
+Aquecimento do worker antes de aceitar tráfego (chamado no lifespan)
+
+1. Abre as conexões do pool do primário e das réplicas
+2. Executa requisições internas (ASGI, sem rede) para as rotas quentes,
+   preenchendo os caches da aplicação (estatísticas e totais da listagem)
+
+Falhas não impedem a subida: o worker apenas começa com caches frios.
+"""
+import asyncio
+import time
+from typing import List
+from urllib.parse import urlsplit
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message
+
+from app.api.database import engines_nomeados
+
+
+async def abrir_pool(engine: AsyncEngine, conexoes: int) -> int:
+    """Abre `conexoes` conexões simultâneas (ficam no pool ao serem devolvidas)"""
+
+    async def abrir():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    resultados = await asyncio.gather(
+        *(abrir() for _ in range(conexoes)), return_exceptions=True
+    )
+    return sum(1 for r in resultados if not isinstance(r, BaseException))
+
+
+async def requisicao_interna(app: ASGIApp, caminho: str) -> int:
+    """GET interno pela pilha ASGI completa; devolve o status da resposta"""
+    partes = urlsplit(caminho)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": partes.path,
+        "raw_path": partes.path.encode(),
+        "query_string": partes.query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"aquecimento"), (b"accept-encoding", b"br, gzip")],
+        "client": ("127.0.0.1", 0),
+        "server": ("aquecimento", 80),
+    }
+    status_code = 0
+    enviado = asyncio.Event()
+    corpo_lido = False
+
+    async def receive() -> Message:
+        nonlocal corpo_lido
+        if not corpo_lido:
+            corpo_lido = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Como um servidor real: desconexão só depois da resposta
+        await enviado.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            enviado.set()
+
+    await app(scope, receive, send)
+    return status_code
+
+
+async def aquecer(app: ASGIApp, caminhos: List[str], conexoes: int) -> None:
+    inicio = time.perf_counter()
+
+    for nome, engine in engines_nomeados().items():
+        abertas = await abrir_pool(engine, conexoes)
+        print(f"🔌 Pool {nome}: {abertas}/{conexoes} conexões abertas")
+
+    for caminho in caminhos:
+        try:
+            status_code = await requisicao_interna(app, caminho)
+            print(f"🔥 {caminho}: {status_code}")
+        except Exception as e:
+            print(f"⚠️  Aquecimento de {caminho} falhou: {e}")
+
+    print(f"✅ Aquecimento concluído em {time.perf_counter() - inicio:.2f}s")
@@ -0,0 +1,88 @@
+"""
+Busca textual de operadoras (full-text + trigramas, sem acentos)
+
+As expressões abaixo precisam ser idênticas às dos índices criados em
+scripts/script.sql (idx_cadastro_busca_*), senão o planner não os usa.
+"""
+import re
+import unicodedata
+from typing import Sequence
+
+from sqlalchemy import Select, case, false, func, literal, literal_column, or_, select
+
+from app.api.models import Operadora
+
+# Documento de busca: razão social + nome fantasia + cidade, normalizado
+# por busca_documento() (lower + f_unaccent)
+documento = func.busca_documento(
+    Operadora.razao_social, Operadora.nome_fantasia, Operadora.cidade
+)
+
+# Configuração textual sem stemming; precisa ser literal para casar com o índice
+SIMPLE = literal_column("'simple'::regconfig")
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas e sem acentos (equivalente em Python a busca_normalizar)"""
+    decomposto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).strip()
+
+
+def tsquery_prefixo(termo: str) -> str:
+    """
+    Monta tsquery com prefixo em todos os tokens ("unimed bel" ->
+    "unimed:* & bel:*"), para responder enquanto o usuário digita
+    """
+    tokens = re.findall(r"\w+", termo)
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+def consulta_busca(q: str, limit: int, colunas: Sequence = (Operadora,)) -> Select:
+    """
+    Consulta ordenada por relevância para o termo `q`, com `colunas` e a
+    `relevancia` calculada
+    """
+    termo = normalizar(q)
+    digitos = "".join(filter(str.isdigit, q))
+    tsquery_texto = tsquery_prefixo(termo)
+
+    tsvector = func.to_tsvector(SIMPLE, documento)
+    tsquery = func.to_tsquery(SIMPLE, tsquery_texto)
+
+    criterios = [
+        # Substring em qualquer posição (servido pelo índice de trigramas)
+        documento.contains(termo, autoescape=True),
+        # Similaridade por palavra, tolera erros de digitação
+        literal(termo).op("<%")(documento),
+    ]
+    if tsquery_texto:
+        criterios.append(tsvector.op("@@")(tsquery))
+    # Prefixo de CNPJ (servido por idx_cadastro_cnpj_prefixo)
+    cnpj_prefixo = (
+        Operadora.cnpj.startswith(digitos, autoescape=True)
+        if len(digitos) >= 2
+        else false()
+    )
+    criterios.append(cnpj_prefixo)
+
+    relevancia = (
+        (func.ts_rank(tsvector, tsquery) if tsquery_texto else literal(0.0))
+        + func.word_similarity(termo, documento)
+        + case(
+            (
+                func.busca_normalizar(Operadora.razao_social).startswith(
+                    termo, autoescape=True
+                ),
+                0.5,
+            ),
+            else_=0.0,
+        )
+        + case((cnpj_prefixo, 1.0), else_=0.0)
+    ).label("relevancia")
+
+    return (
+        select(*colunas, relevancia)
+        .where(or_(*criterios))
+        .order_by(relevancia.desc(), Operadora.razao_social, Operadora.id)
+        .limit(limit)
+    )
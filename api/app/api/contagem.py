@@ -0,0 +1,30 @@
+"""
+Contagem de linhas para listagens paginadas (exata ou estimada pelo planner)
+"""
+import json
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+
+async def contar_exato(db: AsyncSession, query: Select) -> int:
+    """COUNT(*) sobre a consulta filtrada"""
+    return await db.scalar(select(func.count()).select_from(query.subquery()))
+
+
+async def contar_estimado(db: AsyncSession, query: Select) -> int:
+    """
+    Estimativa de linhas do planner (EXPLAIN), baseada nas estatísticas da
+    tabela. Não lê as linhas, então o custo independe do filtro.
+    """
+    conn = await db.connection()
+    compiled = query.compile(dialect=conn.dialect)
+    params = tuple(compiled.params[nome] for nome in compiled.positiontup)
+
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)
+    plano = result.scalar()
+    if isinstance(plano, str):
+        plano = json.loads(plano)
+
+    return int(plano[0]["Plan"]["Plan Rows"])
@@ -1,12 +1,34 @@
 """
 Configuração do banco de dados
+
+- `engine`/`SessionLocal`: engine síncrona, usada para DDL e scripts
+- `async_engine`/`get_db`: primário, para escritas e o que precisa do dado
+  mais recente
+- `get_read_db`/`conectar_leitura`: leituras, distribuídas entre as réplicas
+  (DATABASE_REPLICA_URLS) com fallback para o primário; uma réplica que
+  falha fica fora da rotação por DB_REPLICA_RETRY_SECONDS
 """
-from sqlalchemy import create_engine
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import Delete, Insert, Update, create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
 
-# Criar engine do SQLAlchemy
+# Criar engine do SQLAlchemy (síncrona, usada para DDL e scripts)
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
@@ -21,16 +43,186 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+
+def criar_engine_async(url: str) -> AsyncEngine:
+    """Engine asyncpg com o pool e o statement_timeout configurados"""
+    server_settings = {"application_name": "ans-analytics-api"}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+
+    return create_async_engine(
+        make_url(url).set(drivername="postgresql+asyncpg"),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            "server_settings": server_settings,
+            "timeout": settings.DB_CONNECT_TIMEOUT,
+        },
+        echo=settings.DEBUG,
+    )
+
+
+# Engine assíncrona (asyncpg) do primário
+async_engine = criar_engine_async(settings.DATABASE_URL)
+
+# Réplicas de leitura (opcionais)
+replica_engines: List[AsyncEngine] = [
+    criar_engine_async(url) for url in settings.DATABASE_REPLICA_URLS
+]
+
+# Session factory assíncrona
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base para modelos
 Base = declarative_base()
 
 # Dependência para obter sessão do banco
-def get_db():
+async def get_db():
     """
-    Fornece sessão do banco de dados para dependências do FastAPI
+    Fornece sessão assíncrona do banco de dados para dependências do FastAPI
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# ----------------------------
+# Roteamento de leituras
+# ----------------------------
+_proxima_replica = itertools.count()
+# engine -> instante (monotonic) até o qual a réplica fica fora da rotação
+_replicas_indisponiveis: Dict[AsyncEngine, float] = {}
+
+
+def _marcar_indisponivel(replica: AsyncEngine, erro) -> None:
+    _replicas_indisponiveis[replica] = time.monotonic() + settings.DB_REPLICA_RETRY_SECONDS
+    print(f"⚠️  Réplica {replica.url.host} fora da rotação: {erro}")
+
+
+def _monitorar_replica(replica: AsyncEngine) -> None:
+    """Tira a réplica da rotação quando a conexão com ela falha"""
+
+    @event.listens_for(replica.sync_engine, "handle_error")
+    def _erro(context):
+        if context.is_disconnect or context.connection is None:
+            _marcar_indisponivel(replica, context.original_exception)
+
+    # Falhas ao abrir conexão (ex.: OSError do asyncpg) não passam pelo
+    # handle_error
+    @event.listens_for(replica.sync_engine, "do_connect")
+    def _conectar(dialect, conn_rec, cargs, cparams):
+        try:
+            return dialect.connect(*cargs, **cparams)
+        except Exception as e:
+            _marcar_indisponivel(replica, e)
+            raise
+
+
+for _replica in replica_engines:
+    _monitorar_replica(_replica)
+
+
+def escolher_replica() -> Optional[AsyncEngine]:
+    """Próxima réplica disponível (rodízio), ou None para usar o primário"""
+    if not replica_engines:
+        return None
+    inicio = next(_proxima_replica) % len(replica_engines)
+    agora = time.monotonic()
+    for replica in replica_engines[inicio:] + replica_engines[:inicio]:
+        if _replicas_indisponiveis.get(replica, 0) <= agora:
+            return replica
+    return None
+
+
+class RoteamentoSession(Session):
+    """
+    Sessão que lê de uma réplica (escolhida na primeira consulta, entre as
+    que estão na rotação) e envia escritas ao primário. A conexão só é
+    aberta quando uma consulta é feita, então requisições respondidas pelo
+    cache não ocupam o pool.
+    """
+
+    _replica = None
+
+    def _escolher_bind(self) -> AsyncEngine:
+        # Sem conexão de teste: o pre-ping do pool valida a conexão no
+        # checkout e, se a réplica cair, o handle_error a tira da rotação
+        # (a requisição em curso falha; as seguintes vão para outra)
+        return escolher_replica() or async_engine
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            return async_engine.sync_engine
+        if self._replica is None:
+            self._replica = self._escolher_bind()
+        return self._replica.sync_engine
+
+
+ReadSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=RoteamentoSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+async def get_read_db():
+    """
+    Sessão de leitura para as rotas da API: usa as réplicas em rodízio e o
+    primário quando não há réplica disponível
+    """
+    async with ReadSessionLocal() as db:
         yield db
+
+
+@asynccontextmanager
+async def conectar_leitura() -> AsyncIterator[AsyncConnection]:
+    """Conexão de leitura dedicada (réplica, com fallback para o primário)"""
+    conn = None
+    replica = escolher_replica()
+    while replica is not None and conn is None:
+        try:
+            conn = await replica.connect()
+        except (OSError, SQLAlchemyError, asyncio.TimeoutError) as e:
+            _marcar_indisponivel(replica, e)
+            replica = escolher_replica()
+    if conn is None:
+        conn = await async_engine.connect()
+    try:
+        yield conn
     finally:
-        db.close()
+        await conn.close()
+
+
+def engines_nomeados() -> Dict[str, AsyncEngine]:
+    """Primário e réplicas, por nome (para métricas e diagnóstico)"""
+    engines = {"primario": async_engine}
+    engines.update({f"replica{i}": replica for i, replica in enumerate(replica_engines)})
+    return engines
+
+
+def estado_replicas() -> List[dict]:
+    """Situação das réplicas (para o health check)"""
+    agora = time.monotonic()
+    return [
+        {
+            "host": replica.url.host,
+            "disponivel": _replicas_indisponiveis.get(replica, 0) <= agora,
+        }
+        for replica in replica_engines
+    ]
+
+
+async def fechar_engines():
+    """Fecha os pools do primário e das réplicas"""
+    await async_engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
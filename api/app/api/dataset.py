@@ -0,0 +1,69 @@
+"""
+Versão do dataset carregado, publicada pelo import_data.py em `dataset_versao`
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.models import DatasetVersao
+
+
+class VersaoDataset:
+    """
+    Identifica a carga atual dos dados. O import_data.py publica uma versão
+    nova só ao fim de uma carga bem-sucedida, então ela serve para invalidar
+    caches derivados dos dados. O banco é consultado (uma leitura por chave
+    primária) no máximo uma vez a cada `intervalo` segundos.
+    """
+
+    def __init__(self, intervalo: float = 30):
+        self.intervalo = intervalo
+        self._versao: Optional[str] = None
+        self._verificado_em = 0.0
+        self._lock = asyncio.Lock()
+        self._ouvintes: List[Callable[[str], Awaitable]] = []
+
+    def ao_mudar(self, callback: Callable[[str], Awaitable]):
+        """Registra `callback(versao)`, chamado quando a versão observada muda"""
+        self._ouvintes.append(callback)
+
+    @property
+    def observada(self) -> Optional[str]:
+        """Última versão lida do banco (sem consultá-lo), ou None antes da primeira"""
+        return self._versao
+
+    def _expirada(self) -> bool:
+        return (
+            self._versao is None
+            or time.monotonic() - self._verificado_em >= self.intervalo
+        )
+
+    async def atual(self, db: AsyncSession) -> str:
+        """Retorna a versão atual, consultando o banco se o intervalo expirou"""
+        if not self._expirada():
+            return self._versao
+
+        mudou = False
+        async with self._lock:
+            if self._expirada():
+                versao = await db.scalar(
+                    select(DatasetVersao.versao).where(DatasetVersao.id == 1)
+                )
+                versao = versao or "0"
+                mudou = versao != self._versao
+                self._versao = versao
+                self._verificado_em = time.monotonic()
+
+        if mudou:
+            await self._notificar(self._versao)
+        return self._versao
+
+    async def _notificar(self, versao: str):
+        for callback in self._ouvintes:
+            try:
+                await callback(versao)
+            except Exception as e:
+                print(f"⚠️  Falha ao processar nova versão do dataset: {e}")
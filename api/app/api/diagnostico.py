@@ -0,0 +1,139 @@
+"""
+Diagnóstico de consultas (ligado por ambiente via Settings)
+
+- Consultas acima de DB_SLOW_QUERY_MS são registradas com os parâmetros e,
+  para uma amostra de SELECTs (DB_EXPLAIN_SAMPLE_RATE), com o plano de
+  `EXPLAIN (ANALYZE, BUFFERS)` executado em outra conexão
+- Requisições com mais de DB_QUERY_BUDGET consultas são registradas com a
+  consulta mais repetida (padrão N+1)
+"""
+import asyncio
+import random
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+# Tamanho máximo de SQL/parâmetros no log
+MAX_TEXTO_LOG = 500
+
+
+class _ConsultasRequisicao:
+    __slots__ = ("rota", "sql")
+
+    def __init__(self, rota: str):
+        self.rota = rota
+        self.sql: Counter = Counter()
+
+
+_requisicao: ContextVar[Optional[_ConsultasRequisicao]] = ContextVar(
+    "diagnostico_requisicao", default=None
+)
+
+# Um EXPLAIN por vez: o diagnóstico não pode virar a causa da lentidão
+_explain_em_andamento = False
+
+
+def _resumir(texto) -> str:
+    texto = " ".join(str(texto).split())
+    if len(texto) > MAX_TEXTO_LOG:
+        return texto[:MAX_TEXTO_LOG] + "..."
+    return texto
+
+
+async def _explicar(engine: AsyncEngine, statement: str, parameters) -> None:
+    """Executa EXPLAIN (ANALYZE, BUFFERS) da consulta em outra conexão"""
+    global _explain_em_andamento
+    try:
+        async with engine.connect() as conn:
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+            )
+            plano = "\n".join(f"    {linha}" for (linha,) in result)
+            # ANALYZE executa a consulta: nada é confirmado
+            await conn.rollback()
+        print(f"🔬 EXPLAIN (ANALYZE, BUFFERS):\n{plano}")
+    except Exception as e:
+        print(f"⚠️  Falha no EXPLAIN da consulta lenta: {e}")
+    finally:
+        _explain_em_andamento = False
+
+
+def instrumentar_engine(engine: AsyncEngine, nome: str) -> None:
+    """Registra os eventos de diagnóstico na engine"""
+    limite = settings.DB_SLOW_QUERY_MS / 1000
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("diagnostico_inicio", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        global _explain_em_andamento
+        inicios = conn.info.get("diagnostico_inicio")
+        if not inicios:
+            return
+        duracao = time.perf_counter() - inicios.pop()
+        if statement.startswith("EXPLAIN"):
+            return
+
+        requisicao = _requisicao.get()
+        if requisicao is not None:
+            requisicao.sql[statement] += 1
+
+        if not limite or duracao < limite:
+            return
+
+        rota = requisicao.rota if requisicao else "-"
+        print(
+            f"🐢 Consulta lenta ({duracao * 1000:.0f} ms, {nome}, {rota}): "
+            f"{_resumir(statement)} | parâmetros: {_resumir(parameters)}"
+        )
+
+        if (
+            statement.lstrip()[:6].upper() == "SELECT"
+            and not executemany
+            and not _explain_em_andamento
+            and random.random() < settings.DB_EXPLAIN_SAMPLE_RATE
+        ):
+            _explain_em_andamento = True
+            asyncio.get_running_loop().create_task(
+                _explicar(engine, statement, parameters)
+            )
+
+
+class DiagnosticoMiddleware:
+    """
+    Middleware ASGI: identifica a requisição nos logs de consulta lenta e
+    verifica o orçamento de consultas por requisição
+    """
+
+    def __init__(self, app: ASGIApp, orcamento: int = 0):
+        self.app = app
+        self.orcamento = orcamento
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requisicao = _ConsultasRequisicao(f"{scope['method']} {scope['path']}")
+        token = _requisicao.set(requisicao)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _requisicao.reset(token)
+            total = sum(requisicao.sql.values())
+            if self.orcamento and total > self.orcamento:
+                sql, repeticoes = requisicao.sql.most_common(1)[0]
+                print(
+                    f"🔁 {requisicao.rota}: {total} consultas "
+                    f"(orçamento {self.orcamento}); mais repetida ({repeticoes}x): "
+                    f"{_resumir(sql)}"
+                )
@@ -0,0 +1,142 @@
+"""
+Exportação em streaming (NDJSON/CSV) das tabelas de despesas
+
+As linhas são lidas com cursor no servidor, em blocos de tamanho fixo, e
+enviadas ao cliente à medida que chegam: a memória usada não depende do
+tamanho do resultado.
+"""
+import csv
+import io
+from decimal import Decimal
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+import orjson
+from sqlalchemy import Select, select
+
+from app.api.database import conectar_leitura
+from app.api.models import DespesaAgregada, DespesaConsolidada
+
+# Colunas exportadas (as dos schemas de resposta; nas agregadas, também as
+# chaves do cadastro, para o join com as operadoras)
+TABELAS: Dict[str, tuple] = {
+    "despesas_consolidadas": (
+        DespesaConsolidada.id,
+        DespesaConsolidada.reg_ans,
+        DespesaConsolidada.cd_conta_contabil,
+        DespesaConsolidada.ano,
+        DespesaConsolidada.trimestre,
+        DespesaConsolidada.valor_despesas,
+    ),
+    "despesas_agregadas": (
+        DespesaAgregada.id,
+        DespesaAgregada.reg_ans,
+        DespesaAgregada.operadora_id,
+        DespesaAgregada.razao_social,
+        DespesaAgregada.uf,
+        DespesaAgregada.total_despesas,
+        DespesaAgregada.media_trimestral,
+        DespesaAgregada.desvio_padrao,
+        DespesaAgregada.coeficiente_variacao,
+    ),
+}
+
+# Filtros aceitos por tabela (cnpj é resolvido para reg_ans pela rota)
+FILTROS: Dict[str, Tuple[str, ...]] = {
+    "despesas_consolidadas": ("cnpj", "reg_ans", "ano", "trimestre"),
+    "despesas_agregadas": ("cnpj", "reg_ans", "uf", "razao_social"),
+}
+
+FORMATOS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class FiltrosInvalidos(ValueError):
+    """Filtro informado que não se aplica à tabela exportada"""
+
+
+def validar_filtros(tabela: str, **filtros) -> None:
+    """
+    Rejeita filtros que a tabela não tem, em vez de ignorá-los e exportar
+    a tabela inteira
+    """
+    invalidos = [
+        nome for nome, valor in filtros.items()
+        if valor is not None and nome not in FILTROS[tabela]
+    ]
+    if invalidos:
+        raise FiltrosInvalidos(
+            f"Filtros não aplicáveis a {tabela}: {', '.join(invalidos)}. "
+            f"Aceitos: {', '.join(FILTROS[tabela])}"
+        )
+
+
+def consulta_exportacao(
+    tabela: str,
+    reg_ans: Optional[str] = None,
+    ano: Optional[int] = None,
+    trimestre: Optional[int] = None,
+    uf: Optional[str] = None,
+    razao_social: Optional[str] = None,
+) -> Select:
+    """SELECT filtrado da tabela, em ordem de id (estável entre exportações)"""
+    colunas = TABELAS[tabela]
+    query = select(*colunas)
+
+    if tabela == "despesas_consolidadas":
+        if reg_ans:
+            query = query.where(DespesaConsolidada.reg_ans == reg_ans)
+        if ano:
+            query = query.where(DespesaConsolidada.ano == ano)
+        if trimestre:
+            query = query.where(DespesaConsolidada.trimestre == trimestre)
+        return query.order_by(DespesaConsolidada.id)
+
+    if reg_ans:
+        query = query.where(DespesaAgregada.reg_ans == reg_ans)
+    if uf:
+        query = query.where(DespesaAgregada.uf == uf.upper())
+    if razao_social:
+        query = query.where(
+            DespesaAgregada.razao_social.icontains(razao_social, autoescape=True)
+        )
+    return query.order_by(DespesaAgregada.id)
+
+
+def _json_default(valor):
+    # Decimal como string, igual às respostas da API
+    if isinstance(valor, Decimal):
+        return str(valor)
+    raise TypeError
+
+
+async def exportar(query: Select, formato: str, fetch_size: int) -> AsyncIterator[bytes]:
+    """
+    Gera o arquivo em blocos de `fetch_size` linhas. Usa uma conexão de
+    leitura própria (não a sessão da requisição), mantida aberta até o fim
+    do streaming.
+    """
+    async with conectar_leitura() as conn:
+        result = await conn.stream(query.execution_options(yield_per=fetch_size))
+
+        if formato == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, delimiter=";", lineterminator="\n")
+            writer.writerow(result.keys())
+
+        async for linhas in result.partitions(fetch_size):
+            if formato == "ndjson":
+                yield b"".join(
+                    orjson.dumps(dict(linha._mapping), default=_json_default) + b"\n"
+                    for linha in linhas
+                )
+            else:
+                writer.writerows(linhas)
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+
+        # CSV vazio ainda traz o cabeçalho
+        if formato == "csv" and buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
@@ -1,7 +1,8 @@
 """
 Modelos SQLAlchemy para o banco de dados
 """
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, Numeric
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, Numeric, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
 from app.api.database import Base  # Importar Base de database.py
 
@@ -32,6 +33,11 @@ class Operadora(Base):
     data_registro_ans = Column(Date)
     data_carga = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Chave da paginação keyset de /api/operadoras
+        Index('idx_cadastro_razao_social_id', 'razao_social', 'id'),
+    )
+
 class DespesaConsolidada(Base):
     __tablename__ = 'despesas_consolidadas'
     
@@ -51,6 +57,9 @@ class DespesaAgregada(Base):
     __tablename__ = 'despesas_agregadas'
     
     id = Column(Integer, primary_key=True, index=True)
+    reg_ans = Column(String(20), index=True)
+    # cadastro_operadoras.id (preenchido pelo import): chave das junções com o cadastro
+    operadora_id = Column(Integer, index=True)
     razao_social = Column(String(255), nullable=False, index=True)
     uf = Column(String(2), nullable=False, index=True)
     total_despesas = Column(Numeric(15, 2), nullable=False)
@@ -58,3 +67,46 @@ class DespesaAgregada(Base):
     desvio_padrao = Column(Numeric(15, 2))
     coeficiente_variacao = Column(Numeric(10, 2))
     data_carga = Column(DateTime, default=datetime.utcnow)
+
+class ImportCheckpoint(Base):
+    __tablename__ = 'import_checkpoints'
+
+    arquivo = Column(String(100), primary_key=True)
+    assinatura = Column(String(64), nullable=False)
+    linhas_processadas = Column(Integer, nullable=False, default=0)
+    linhas_importadas = Column(Integer, nullable=False, default=0)
+    linhas_rejeitadas = Column(Integer, nullable=False, default=0)
+    status = Column(String(20), nullable=False, default='em_andamento')
+    atualizado_em = Column(DateTime, default=datetime.utcnow)
+
+class DatasetVersao(Base):
+    __tablename__ = 'dataset_versao'
+
+    # Linha única, atualizada pelo import ao fim de cada carga
+    id = Column(Integer, primary_key=True, default=1)
+    versao = Column(String(64), nullable=False)
+    publicado_em = Column(DateTime, default=datetime.utcnow)
+
+class EstatisticaSnapshot(Base):
+    __tablename__ = 'estatisticas_snapshot'
+
+    id = Column(Integer, primary_key=True)
+    versao = Column(String(64), nullable=False)
+    dados = Column(JSONB, nullable=False)
+    gerado_em = Column(DateTime, default=datetime.utcnow)
+
+class RankingDespesa(Base):
+    __tablename__ = 'ranking_despesas'
+
+    # PK (metrica, dimensao, particao, posicao): páginas do ranking são faixas do índice
+    metrica = Column(String(30), primary_key=True)
+    dimensao = Column(String(20), primary_key=True)
+    particao = Column(String(100), primary_key=True)
+    posicao = Column(Integer, primary_key=True)
+    despesa_agregada_id = Column(Integer, nullable=False)
+    razao_social = Column(String(255), nullable=False)
+    uf = Column(String(2), nullable=False)
+    modalidade = Column(String(100))
+    total_despesas = Column(Numeric(15, 2), nullable=False)
+    media_trimestral = Column(Numeric(15, 2), nullable=False)
+    coeficiente_variacao = Column(Numeric(10, 2))
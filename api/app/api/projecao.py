@@ -0,0 +1,51 @@
+"""
+Projeção de colunas das listagens de operadoras
+
+A listagem e a busca leem apenas as colunas do schema de resposta (linhas
+como dicts, sem entidades ORM nem identity map) e aceitam `fields=` para
+devolver só um subconjunto delas.
+"""
+from typing import Iterable, Mapping, Optional, Tuple
+
+from app.api.models import Operadora
+from app.schemas import BuscaResponse, OperadoraResponse
+
+# Campos disponíveis em cada rota (na ordem dos schemas)
+CAMPOS_LISTAGEM: Tuple[str, ...] = tuple(OperadoraResponse.model_fields)
+CAMPOS_BUSCA: Tuple[str, ...] = tuple(BuscaResponse.model_fields)
+
+# Chave da paginação keyset: sempre lida, mesmo fora de `fields`
+CAMPOS_CURSOR: Tuple[str, ...] = ("razao_social", "id")
+
+
+class CamposInvalidos(ValueError):
+    """`fields` pediu campos que a rota não oferece"""
+
+
+def parse_fields(fields: Optional[str], permitidos: Tuple[str, ...]) -> Optional[Tuple[str, ...]]:
+    """
+    Converte "cnpj, razao_social" em ("cnpj", "razao_social"), sem repetições.
+    None quando `fields` não foi informado (resposta completa).
+    """
+    if fields is None:
+        return None
+    campos = tuple(dict.fromkeys(c.strip() for c in fields.split(",") if c.strip()))
+    if not campos:
+        raise CamposInvalidos("Informe ao menos um campo em fields")
+    invalidos = [campo for campo in campos if campo not in permitidos]
+    if invalidos:
+        raise CamposInvalidos(
+            f"Campos inválidos: {', '.join(invalidos)}. "
+            f"Disponíveis: {', '.join(permitidos)}"
+        )
+    return campos
+
+
+def colunas_operadora(campos: Iterable[str]) -> list:
+    """Colunas de `cadastro_operadoras` para os campos (ignora os calculados)"""
+    return [getattr(Operadora, campo) for campo in campos if hasattr(Operadora, campo)]
+
+
+def recortar(linha: Mapping, campos: Tuple[str, ...]) -> dict:
+    """Somente os `campos` da linha, na ordem pedida"""
+    return {campo: linha[campo] for campo in campos}
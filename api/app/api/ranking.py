@@ -0,0 +1,54 @@
+"""
+Rankings de despesas pré-calculados
+
+`ranking_despesas` é gerada pelo import_data.py a cada carga, com a posição
+de cada operadora por métrica no ranking geral, no da UF e no da modalidade.
+Uma página do ranking é uma faixa de `posicao` na chave primária
+(metrica, dimensao, particao, posicao): sem ordenação na consulta e com o
+mesmo custo em qualquer profundidade.
+"""
+from typing import Optional, Tuple
+
+from sqlalchemy import Select, func, select
+
+from app.api.models import RankingDespesa
+
+METRICAS = ("total_despesas", "media_trimestral", "coeficiente_variacao")
+
+
+def particao_ranking(uf: Optional[str], modalidade: Optional[str]) -> Tuple[str, str]:
+    """
+    (dimensao, particao) do ranking pedido, normalizada como na geração:
+    UF em maiúsculas, modalidade em minúsculas
+    """
+    if uf and modalidade:
+        raise ValueError("Informe uf ou modalidade, não ambos")
+    if uf:
+        return "uf", uf.strip().upper()
+    if modalidade:
+        return "modalidade", modalidade.strip().lower()
+    return "geral", ""
+
+
+def _na_particao(query: Select, metrica: str, dimensao: str, particao: str) -> Select:
+    return query.where(
+        RankingDespesa.metrica == metrica,
+        RankingDespesa.dimensao == dimensao,
+        RankingDespesa.particao == particao,
+    )
+
+
+def consulta_pagina(
+    metrica: str, dimensao: str, particao: str, offset: int, limit: int
+) -> Select:
+    """Posições offset+1 .. offset+limit (faixa da chave primária)"""
+    return _na_particao(select(RankingDespesa), metrica, dimensao, particao).where(
+        RankingDespesa.posicao.between(offset + 1, offset + limit)
+    ).order_by(RankingDespesa.posicao)
+
+
+def consulta_total(metrica: str, dimensao: str, particao: str) -> Select:
+    """Tamanho do ranking: a maior posição (lida na ponta do índice)"""
+    return _na_particao(
+        select(func.max(RankingDespesa.posicao)), metrica, dimensao, particao
+    )
@@ -0,0 +1,286 @@
+"""
+Registro de operadoras em memória
+
+O cadastro tem poucos milhares de linhas, então cada worker pode mantê-lo
+inteiro em RAM e responder listagem, detalhe e busca sem ir ao banco.
+O registro é imutável: uma recarga monta um novo objeto e troca a referência
+de uma vez, então requisições em andamento nunca veem um estado parcial.
+"""
+import asyncio
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.api.busca import normalizar
+from app.api.database import AsyncSessionLocal
+from app.api.dataset import VersaoDataset
+from app.api.models import Operadora
+from app.core.pagination import NEXT
+from app.core.serializacao import codificar
+from app.schemas import OperadoraDetailResponse
+
+
+@dataclass
+class PaginaRegistro:
+    itens: List[dict]
+    total: int
+    has_next: bool
+    has_prev: bool
+
+
+class RegistroOperadoras:
+    """
+    Snapshot imutável do cadastro, na mesma ordem do banco
+    (razao_social, id), com índices por CNPJ, registro ANS, UF e modalidade
+    """
+
+    def __init__(self, operadoras: List[dict], versao: str):
+        self.versao = versao
+        self.operadoras = operadoras
+
+        self.por_cnpj: Dict[str, dict] = {}
+        self.por_registro: Dict[str, dict] = {}
+        self.posicao_por_id: Dict[int, int] = {}
+        self.posicoes_por_uf: Dict[str, List[int]] = {}
+        self.posicoes_por_modalidade: Dict[str, List[int]] = {}
+        self._razao_minuscula: List[str] = []
+        self._razao_busca: List[str] = []
+        self._documentos: List[str] = []
+        self._palavras: List[List[str]] = []
+        self._json_detalhe: Dict[str, bytes] = {}
+
+        for posicao, operadora in enumerate(operadoras):
+            self.por_cnpj[operadora["cnpj"]] = operadora
+            self.por_registro[operadora["registro_operadora"]] = operadora
+            self.posicao_por_id[operadora["id"]] = posicao
+            self.posicoes_por_uf.setdefault(operadora["uf"], []).append(posicao)
+            self.posicoes_por_modalidade.setdefault(
+                (operadora["modalidade"] or "").lower(), []
+            ).append(posicao)
+            self._razao_minuscula.append(operadora["razao_social"].lower())
+            self._razao_busca.append(normalizar(operadora["razao_social"]))
+            documento = normalizar(
+                " ".join(
+                    operadora[campo] or ""
+                    for campo in ("razao_social", "nome_fantasia", "cidade")
+                )
+            )
+            self._documentos.append(documento)
+            self._palavras.append(re.findall(r"\w+", documento))
+
+    def __len__(self):
+        return len(self.operadoras)
+
+    def detalhe_json(self, cnpj: str) -> Optional[bytes]:
+        """JSON do detalhe da operadora, codificado uma vez por snapshot"""
+        corpo = self._json_detalhe.get(cnpj)
+        if corpo is None:
+            operadora = self.por_cnpj.get(cnpj)
+            if operadora is None:
+                return None
+            corpo = codificar(OperadoraDetailResponse.model_validate(operadora))
+            self._json_detalhe[cnpj] = corpo
+        return corpo
+
+    def _filtrar(
+        self,
+        razao_social: Optional[str],
+        uf: Optional[str],
+        modalidade: Optional[str],
+    ) -> List[int]:
+        """Posições (em ordem) que atendem aos filtros de /api/operadoras"""
+        posicoes: Optional[List[int]] = None
+
+        if uf:
+            posicoes = self.posicoes_por_uf.get(uf.upper(), [])
+
+        if modalidade:
+            termo = modalidade.lower()
+            por_modalidade = sorted(
+                posicao
+                for nome, lista in self.posicoes_por_modalidade.items()
+                if termo in nome
+                for posicao in lista
+            )
+            if posicoes is None:
+                posicoes = por_modalidade
+            else:
+                permitidas = set(por_modalidade)
+                posicoes = [p for p in posicoes if p in permitidas]
+
+        if posicoes is None:
+            posicoes = range(len(self.operadoras))
+
+        if razao_social:
+            termo = razao_social.lower()
+            posicoes = [p for p in posicoes if termo in self._razao_minuscula[p]]
+
+        return list(posicoes)
+
+    def listar(
+        self,
+        razao_social: Optional[str],
+        uf: Optional[str],
+        modalidade: Optional[str],
+        page: int,
+        limit: int,
+        cursor: Optional[Tuple[str, int, str]] = None,
+    ) -> Optional[PaginaRegistro]:
+        """
+        Página de operadoras filtradas. Retorna None quando o cursor aponta
+        para uma operadora que não existe neste snapshot (o chamador deve
+        consultar o banco).
+        """
+        posicoes = self._filtrar(razao_social, uf, modalidade)
+        total = len(posicoes)
+
+        if cursor:
+            cursor_razao, cursor_id, direcao = cursor
+            borda = self.posicao_por_id.get(cursor_id)
+            if borda is None or self.operadoras[borda]["razao_social"] != cursor_razao:
+                return None
+
+            if direcao == NEXT:
+                inicio = bisect_right(posicoes, borda)
+                selecionadas = posicoes[inicio:inicio + limit]
+                has_next = inicio + limit < total
+                has_prev = True
+            else:
+                fim = bisect_left(posicoes, borda)
+                selecionadas = posicoes[max(fim - limit, 0):fim]
+                has_next = True
+                has_prev = fim - limit > 0
+        else:
+            inicio = (page - 1) * limit
+            selecionadas = posicoes[inicio:inicio + limit]
+            has_next = inicio + limit < total
+            has_prev = page > 1
+
+        return PaginaRegistro(
+            itens=[self.operadoras[p] for p in selecionadas],
+            total=total,
+            has_next=has_next,
+            has_prev=has_prev,
+        )
+
+    def buscar(self, q: str, limit: int) -> List[Tuple[dict, float]]:
+        """
+        Busca sem acentos por substring e prefixo de palavras (e prefixo de
+        CNPJ), com a mesma pontuação aproximada da busca no banco
+        """
+        termo = normalizar(q)
+        tokens = re.findall(r"\w+", termo)
+        digitos = "".join(filter(str.isdigit, q))
+
+        resultados = []
+        for posicao, documento in enumerate(self._documentos):
+            operadora = self.operadoras[posicao]
+            palavras = self._palavras[posicao]
+
+            casados = sum(
+                1 for token in tokens if any(p.startswith(token) for p in palavras)
+            )
+            substring = bool(termo) and termo in documento
+            cnpj = len(digitos) >= 2 and operadora["cnpj"].startswith(digitos)
+
+            if not (substring or cnpj or (tokens and casados == len(tokens))):
+                continue
+
+            relevancia = casados / max(len(tokens), 1)
+            if self._razao_busca[posicao].startswith(termo):
+                relevancia += 0.5
+            if cnpj:
+                relevancia += 1.0
+            resultados.append((operadora, relevancia))
+
+        resultados.sort(key=lambda item: -item[1])
+        return resultados[:limit]
+
+
+async def carregar_registro(versao: str) -> RegistroOperadoras:
+    """Lê o cadastro inteiro do banco, na ordem da paginação"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(*Operadora.__table__.columns).order_by(
+                Operadora.razao_social, Operadora.id
+            )
+        )
+        operadoras = [dict(row) for row in result.mappings()]
+
+    return RegistroOperadoras(operadoras, versao)
+
+
+class GerenciadorRegistro:
+    """
+    Mantém o registro atual e o recarrega em segundo plano quando a versão
+    do dataset muda: assim que uma requisição a observa (`ao_mudar_versao`,
+    registrado em `VersaoDataset.ao_mudar`) e, sem tráfego, a cada
+    `intervalo` segundos. Enquanto a recarga não termina, `vigente` retorna
+    None e as rotas consultam o banco, para nunca servir o cadastro antigo
+    com os validadores (ETag) e chaves de cache da versão nova.
+    """
+
+    def __init__(self, dataset: VersaoDataset, intervalo: float = 60):
+        self.dataset = dataset
+        self.intervalo = intervalo
+        self.atual: Optional[RegistroOperadoras] = None
+        self._tarefa: Optional[asyncio.Task] = None
+        self._recarga: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def vigente(self) -> Optional[RegistroOperadoras]:
+        """O registro, se for da versão do dataset observada por último"""
+        atual = self.atual
+        if atual is None or atual.versao != self.dataset.observada:
+            return None
+        return atual
+
+    async def _versao_dataset(self) -> str:
+        async with AsyncSessionLocal() as db:
+            return await self.dataset.atual(db)
+
+    async def recarregar_se_mudou(self) -> bool:
+        """Recarrega o registro se a versão do dataset mudou"""
+        versao = await self._versao_dataset()
+        async with self._lock:
+            if self.atual is not None and self.atual.versao == versao:
+                return False
+
+            novo = await carregar_registro(versao)
+            # Troca atômica: requisições em andamento seguem com o snapshot antigo
+            self.atual = novo
+        print(f"🗂️  Registro de operadoras carregado: {len(novo)} (versão {versao})")
+        return True
+
+    async def _recarregar(self):
+        try:
+            await self.recarregar_se_mudou()
+        except Exception as e:
+            print(f"⚠️  Falha ao recarregar registro de operadoras: {e}")
+
+    async def ao_mudar_versao(self, versao: str):
+        """Callback de `VersaoDataset.ao_mudar`: agenda a recarga sem esperá-la"""
+        if self._recarga is None or self._recarga.done():
+            self._recarga = asyncio.create_task(self._recarregar())
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.intervalo)
+            await self._recarregar()
+
+    async def iniciar(self):
+        self.dataset.ao_mudar(self.ao_mudar_versao)
+        await self.recarregar_se_mudou()
+        self._tarefa = asyncio.create_task(self._loop())
+
+    async def parar(self):
+        for tarefa in (self._tarefa, self._recarga):
+            if tarefa:
+                tarefa.cancel()
+                try:
+                    await tarefa
+                except asyncio.CancelledError:
+                    pass
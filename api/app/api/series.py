@@ -0,0 +1,82 @@
+"""
+Séries temporais de despesas agregadas no banco
+
+Agrupa `despesas_consolidadas` por trimestre e (opcionalmente) por prefixo
+do código da conta contábil, devolvendo séries compactas em vez de uma linha
+por conta por trimestre.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Select, func, literal, select
+
+from app.api.models import DespesaConsolidada, Operadora
+
+
+def consulta_serie(
+    reg_ans: Optional[str] = None,
+    uf: Optional[str] = None,
+    modalidade: Optional[str] = None,
+    nivel: Optional[int] = None,
+    ano_inicio: Optional[int] = None,
+    ano_fim: Optional[int] = None,
+) -> Select:
+    """
+    SELECT ano, trimestre, conta, total. `conta` é o prefixo de `nivel`
+    dígitos do código da conta (vazio quando `nivel` não é informado).
+    """
+    conta = (
+        func.substr(DespesaConsolidada.cd_conta_contabil, 1, nivel)
+        if nivel
+        else literal("")
+    ).label("conta")
+
+    query = select(
+        DespesaConsolidada.ano,
+        DespesaConsolidada.trimestre,
+        conta,
+        func.sum(DespesaConsolidada.valor_despesas).label("total"),
+    )
+
+    if reg_ans:
+        query = query.where(DespesaConsolidada.reg_ans == reg_ans)
+    if uf or modalidade:
+        query = query.join(
+            Operadora, Operadora.registro_operadora == DespesaConsolidada.reg_ans
+        )
+        if uf:
+            query = query.where(Operadora.uf == uf.upper())
+        if modalidade:
+            query = query.where(Operadora.modalidade.icontains(modalidade, autoescape=True))
+    if ano_inicio:
+        query = query.where(DespesaConsolidada.ano >= ano_inicio)
+    if ano_fim:
+        query = query.where(DespesaConsolidada.ano <= ano_fim)
+
+    return query.group_by(
+        DespesaConsolidada.ano, DespesaConsolidada.trimestre, conta
+    ).order_by(DespesaConsolidada.ano, DespesaConsolidada.trimestre, conta)
+
+
+def montar_series(linhas) -> Tuple[List[str], Dict[str, list]]:
+    """
+    Converte as linhas (ano, trimestre, conta, total) em períodos ("2025T1")
+    e uma lista de valores por conta, alinhada aos períodos (None onde a
+    conta não teve lançamento)
+    """
+    periodos: List[str] = []
+    indice: Dict[Tuple[int, int], int] = {}
+    valores: Dict[Tuple[int, int], Dict[str, object]] = {}
+
+    for ano, trimestre, conta, total in linhas:
+        chave = (ano, trimestre)
+        if chave not in indice:
+            indice[chave] = len(periodos)
+            periodos.append(f"{ano}T{trimestre}")
+            valores[chave] = {}
+        valores[chave][conta] = total
+
+    contas = sorted({conta for por_conta in valores.values() for conta in por_conta})
+    series = {
+        conta: [valores[chave].get(conta) for chave in indice] for conta in contas
+    }
+    return periodos, series
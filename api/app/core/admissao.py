@@ -0,0 +1,150 @@
+"""
+Controle de admissão por classe de rota
+
+Rotas caras (busca, agregações, exportação, listagem) têm um limite de
+requisições simultâneas e uma fila limitada. Além da fila a requisição é
+recusada na hora (429); se esperar demais na fila, recebe 503. As duas
+respostas trazem Retry-After.
+
+Rotas sem classe (health check, detalhe por CNPJ, documentação) não passam
+pelo controle, então continuam respondendo com o servidor sobrecarregado.
+"""
+import asyncio
+import re
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Primeira regra que casar com o caminho define a classe
+CLASSES_ROTA: List[Tuple[Pattern, str]] = [
+    (re.compile(r"^/api/buscar/?$"), "busca"),
+    (re.compile(r"^/api/(estatisticas|despesas/serie)/?$"), "agregacao"),
+    (re.compile(r"^/api/exportar/"), "exportacao"),
+    (re.compile(r"^/api/(operadoras(/lote)?|ranking)/?$"), "listagem"),
+    # Histórico completo de despesas da operadora (sem paginação)
+    (re.compile(r"^/api/operadoras/[^/]+/despesas/?$"), "listagem"),
+]
+
+
+class Sobrecarga(Exception):
+    """Requisição recusada pelo controle de admissão"""
+
+    def __init__(self, status_code: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status_code = status_code
+        self.mensagem = mensagem
+
+
+class LimiteConcorrencia:
+    """Semáforo com fila limitada e tempo máximo de espera"""
+
+    def __init__(self, nome: str, concorrencia: int, fila: int, espera_max: float):
+        self.nome = nome
+        self.concorrencia = concorrencia
+        self.fila = fila
+        self.espera_max = espera_max
+        self._semaforo = asyncio.Semaphore(concorrencia)
+
+        self.em_execucao = 0
+        self.na_fila = 0
+        self.recusadas = 0
+
+    @asynccontextmanager
+    async def entrar(self):
+        if self._semaforo.locked():
+            if self.na_fila >= self.fila:
+                self.recusadas += 1
+                raise Sobrecarga(429, f"Muitas requisições simultâneas em '{self.nome}'")
+
+            self.na_fila += 1
+            try:
+                await asyncio.wait_for(self._semaforo.acquire(), self.espera_max)
+            except asyncio.TimeoutError:
+                self.recusadas += 1
+                raise Sobrecarga(503, f"Servidor sobrecarregado em '{self.nome}'")
+            finally:
+                self.na_fila -= 1
+        else:
+            await self._semaforo.acquire()
+
+        self.em_execucao += 1
+        try:
+            yield
+        finally:
+            self.em_execucao -= 1
+            self._semaforo.release()
+
+    def estado(self) -> Dict[str, int]:
+        return {
+            "concorrencia": self.concorrencia,
+            "em_execucao": self.em_execucao,
+            "na_fila": self.na_fila,
+            "recusadas": self.recusadas,
+        }
+
+
+def classificar(caminho: str) -> Optional[str]:
+    """Classe de admissão do caminho, ou None se a rota não é limitada"""
+    for padrao, classe in CLASSES_ROTA:
+        if padrao.match(caminho):
+            return classe
+    return None
+
+
+class ControleAdmissao:
+    """Limites por classe de rota (compartilhados com o health check)"""
+
+    def __init__(
+        self,
+        limites: Dict[str, List[int]],
+        espera_max: float = 2.0,
+        retry_after: int = 1,
+    ):
+        self.retry_after = retry_after
+        self.limites = {
+            classe: LimiteConcorrencia(classe, concorrencia, fila, espera_max)
+            for classe, (concorrencia, fila) in limites.items()
+        }
+
+    def limite(self, caminho: str) -> Optional[LimiteConcorrencia]:
+        classe = classificar(caminho)
+        return self.limites.get(classe) if classe else None
+
+    def estado(self) -> Dict[str, Dict[str, int]]:
+        return {classe: limite.estado() for classe, limite in self.limites.items()}
+
+
+class AdmissaoMiddleware:
+    """
+    Middleware ASGI: a vaga é mantida até o fim da resposta (inclusive
+    em streaming)
+    """
+
+    def __init__(self, app: ASGIApp, controle: ControleAdmissao):
+        self.app = app
+        self.controle = controle
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        limite = self.controle.limite(scope["path"]) if scope["type"] == "http" else None
+        if limite is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            async with limite.entrar():
+                await self.app(scope, receive, send)
+        except Sobrecarga as e:
+            resposta = JSONResponse(
+                status_code=e.status_code,
+                content={
+                    "error": True,
+                    "message": e.mensagem,
+                    "path": scope["path"],
+                    "timestamp": datetime.now().isoformat(),
+                },
+                headers={"Retry-After": str(self.controle.retry_after)},
+            )
+            await resposta(scope, receive, send)
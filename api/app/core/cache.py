@@ -0,0 +1,507 @@
+"""
+Cache da API com backends plugáveis
+
+- `memory`: LRU + TTL no próprio processo (cada worker tem o seu)
+- `sqlite`: arquivo SQLite compartilhado pelos workers da mesma máquina
+- `redis`: servidor Redis compartilhado por todos os workers/máquinas
+
+Independente do backend, `Cache.get_or_set` garante single-flight por
+processo: só uma chamada recalcula uma chave ausente e as demais aguardam.
+
+Os valores derivam dos dados importados: as chaves levam a versão do dataset
+(`chave_versionada`) e, quando ela muda, `Cache.descartar_versoes` remove as
+entradas das versões anteriores.
+"""
+import asyncio
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+def chave_versionada(nome: str, versao: str, *partes: Any) -> str:
+    """Chave `nome:versao:partes` (o marcador `:versao:` identifica a carga)"""
+    return f"{nome}:{versao}:" + "|".join(map(str, partes))
+
+
+def _marcador(versao: str) -> str:
+    return f":{versao}:"
+
+
+class _LiderCancelado(Exception):
+    """A requisição que calculava o valor foi cancelada; quem espera tenta de novo"""
+
+
+def _tamanho(value: Any) -> int:
+    """Tamanho aproximado em bytes (exato para bytes/str e objetos com `nbytes`)"""
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    Armazenamento em memória limitado por número de entradas e
+    (opcionalmente) bytes. Ao estourar o limite, remove as entradas usadas há
+    mais tempo; entradas expiradas saem na leitura ou em `remover_expirados`.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (value, expiry, tamanho)
+        self._cache: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    def _remover(self, key: str):
+        _, _, tamanho = self._cache.pop(key)
+        self._bytes -= tamanho
+
+    def get(self, key: str):
+        """Obtém valor do cache se não expirou"""
+        entry = self._cache.get(key)
+        if entry is not None:
+            data, expiry, _ = entry
+            if time.monotonic() < expiry:
+                self._cache.move_to_end(key)
+                return data
+            self._remover(key)
+            self.expirations += 1
+        return None
+
+    def set(self, key: str, value: Any, ttl_seconds: int = 300):
+        """Define valor no cache com TTL, removendo as entradas mais antigas se preciso"""
+        if key in self._cache:
+            self._remover(key)
+
+        tamanho = _tamanho(value)
+        if self.max_bytes and tamanho > self.max_bytes:
+            return
+
+        self._cache[key] = (value, time.monotonic() + ttl_seconds, tamanho)
+        self._bytes += tamanho
+
+        while len(self._cache) > self.max_entries or (
+            self.max_bytes and self._bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._cache))
+            self._remover(oldest)
+            self.evictions += 1
+
+    def delete(self, key: str):
+        if key in self._cache:
+            self._remover(key)
+
+    def clear(self):
+        """Limpa cache"""
+        self._cache.clear()
+        self._bytes = 0
+
+    def remover_sem(self, marcador: str) -> int:
+        """Remove as entradas cuja chave não contém `marcador`"""
+        antigas = [key for key in self._cache if marcador not in key]
+        for key in antigas:
+            self._remover(key)
+        return len(antigas)
+
+    def remover_expirados(self) -> int:
+        """Remove todas as entradas expiradas"""
+        agora = time.monotonic()
+        expirados = [key for key, (_, expiry, _) in self._cache.items() if expiry <= agora]
+        for key in expirados:
+            self._remover(key)
+        self.expirations += len(expirados)
+        return len(expirados)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._cache),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+# ----------------------------
+# Backends
+# ----------------------------
+class CacheBackend(ABC):
+    """Interface dos backends de cache"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """Valor da chave, ou None se ausente/expirada"""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl_seconds: int):
+        """Grava valor com TTL"""
+
+    @abstractmethod
+    async def delete(self, key: str):
+        """Remove a chave"""
+
+    @abstractmethod
+    async def clear(self):
+        """Remove todas as chaves deste cache"""
+
+    async def remover_expirados(self) -> int:
+        """Remove entradas expiradas (backends com expiração própria não precisam)"""
+        return 0
+
+    @abstractmethod
+    async def remover_sem(self, marcador: str) -> int:
+        """Remove as chaves que não contêm `marcador`; retorna quantas"""
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+    async def close(self):
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """Cache no próprio processo"""
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 0):
+        self.store = LRUCache(max_entries, max_bytes)
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ttl_seconds):
+        self.store.set(key, value, ttl_seconds)
+
+    async def delete(self, key):
+        self.store.delete(key)
+
+    async def clear(self):
+        self.store.clear()
+
+    async def remover_sem(self, marcador):
+        return self.store.remover_sem(marcador)
+
+    async def remover_expirados(self):
+        return self.store.remover_expirados()
+
+    def stats(self):
+        return self.store.stats()
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Cache em arquivo SQLite compartilhado pelos workers de uma máquina.
+    Valores são serializados com pickle; o limite de entradas remove as que
+    expiram primeiro. O total de entradas em `stats` é o último contado
+    (na gravação e na varredura), para não consultar o arquivo na coleta.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL, expiry REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expiry ON cache(expiry)")
+            self._conn.commit()
+            self._entries = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def _executar(self, sql: str, params: tuple = ()):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            rows = cursor.fetchall()
+            self._conn.commit()
+            return rows, cursor.rowcount
+
+    async def get(self, key):
+        rows, _ = await asyncio.to_thread(
+            self._executar,
+            "SELECT value FROM cache WHERE key = ? AND expiry > ?",
+            (key, time.time()),
+        )
+        return pickle.loads(rows[0][0]) if rows else None
+
+    def _set(self, key, value, ttl_seconds):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expiry) VALUES (?, ?, ?)",
+                (key, pickle.dumps(value), time.time() + ttl_seconds),
+            )
+            total = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            self._entries = min(total, self.max_entries)
+            excedente = total - self.max_entries
+            if excedente > 0:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN "
+                    "(SELECT key FROM cache ORDER BY expiry LIMIT ?)",
+                    (excedente,),
+                )
+                self.evictions += excedente
+            self._conn.commit()
+
+    async def set(self, key, value, ttl_seconds):
+        await asyncio.to_thread(self._set, key, value, ttl_seconds)
+
+    def _descontar(self, removidos: int):
+        self._entries = max(self._entries - removidos, 0)
+
+    async def delete(self, key):
+        _, removidos = await asyncio.to_thread(
+            self._executar, "DELETE FROM cache WHERE key = ?", (key,)
+        )
+        self._descontar(removidos)
+
+    async def clear(self):
+        await asyncio.to_thread(self._executar, "DELETE FROM cache")
+        self._entries = 0
+
+    async def remover_sem(self, marcador):
+        _, removidos = await asyncio.to_thread(
+            self._executar, "DELETE FROM cache WHERE instr(key, ?) = 0", (marcador,)
+        )
+        self._descontar(removidos)
+        return removidos
+
+    async def remover_expirados(self):
+        _, removidos = await asyncio.to_thread(
+            self._executar, "DELETE FROM cache WHERE expiry <= ?", (time.time(),)
+        )
+        self.expirations += removidos
+        # Recontagem periódica: inclui o que os outros workers gravaram
+        rows, _ = await asyncio.to_thread(self._executar, "SELECT COUNT(*) FROM cache")
+        self._entries = rows[0][0]
+        return removidos
+
+    def stats(self):
+        return {
+            "entries": self._entries,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisBackend(CacheBackend):
+    """
+    Cache em Redis compartilhado. A expiração é feita pelo próprio Redis;
+    o limite de memória/eviction deve ser configurado no servidor
+    (maxmemory + maxmemory-policy allkeys-lru).
+    """
+
+    TRAVA_DESCARTE_SEGUNDOS = 300
+
+    def __init__(self, url: str, prefix: str = "ans:"):
+        from redis import asyncio as aioredis
+
+        self.prefix = prefix
+        self._redis = aioredis.from_url(url)
+
+    async def get(self, key):
+        data = await self._redis.get(self.prefix + key)
+        return pickle.loads(data) if data is not None else None
+
+    async def set(self, key, value, ttl_seconds):
+        await self._redis.set(self.prefix + key, pickle.dumps(value), ex=ttl_seconds)
+
+    async def delete(self, key):
+        await self._redis.delete(self.prefix + key)
+
+    async def clear(self):
+        async for key in self._redis.scan_iter(match=self.prefix + "*"):
+            await self._redis.delete(key)
+
+    async def remover_sem(self, marcador):
+        # O Redis é compartilhado: todos os workers veem a versão nova, mas só
+        # o que obtiver a trava varre as chaves. A trava leva o marcador (não
+        # é removida pela própria varredura) e expira sozinha.
+        trava = f"{self.prefix}descarte{marcador}"
+        if not await self._redis.set(trava, 1, nx=True, ex=self.TRAVA_DESCARTE_SEGUNDOS):
+            return 0
+
+        marcador = marcador.encode("utf-8")
+        removidos = 0
+        lote = []
+        async for key in self._redis.scan_iter(match=self.prefix + "*", count=1000):
+            if marcador not in key:
+                lote.append(key)
+            if len(lote) >= 500:
+                removidos += await self._redis.unlink(*lote)
+                lote = []
+        if lote:
+            removidos += await self._redis.unlink(*lote)
+        return removidos
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+# ----------------------------
+# Cache (single-flight + contadores)
+# ----------------------------
+class Cache:
+    """
+    Fachada usada pelas rotas. Conta hits/misses e faz single-flight por
+    processo em `get_or_set`, para qualquer backend.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+        self._descarte: Optional[asyncio.Task] = None
+
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str):
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl_seconds: int = 300):
+        await self.backend.set(key, value, ttl_seconds)
+
+    async def delete(self, key: str):
+        await self.backend.delete(key)
+
+    async def clear(self):
+        await self.backend.clear()
+
+    async def _descartar(self, versao: str) -> int:
+        try:
+            removidas = await self.backend.remover_sem(_marcador(versao))
+        except Exception as e:
+            print(f"⚠️  Falha ao descartar versões anteriores do cache: {e}")
+            return 0
+        if removidas:
+            print(f"🧹 Cache: {removidas} entradas de versões anteriores descartadas")
+        return removidas
+
+    async def descartar_versoes(self, versao: str):
+        """
+        Remove, em segundo plano, as entradas de outras versões do dataset
+        (chaves sem o marcador de `versao`). Chamado quando a versão muda:
+        com TTLs longos, é o que impede valores antigos de ocuparem o cache.
+        A requisição que observou a versão nova não espera a remoção.
+        """
+        if self._descarte is not None and not self._descarte.done():
+            self._descarte.cancel()
+        self._descarte = asyncio.create_task(self._descartar(versao))
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_seconds: int = 300,
+    ):
+        """
+        Retorna o valor da chave; se ausente, só a primeira chamada executa
+        `loader` e as concorrentes aguardam o mesmo resultado (ou exceção)
+        """
+        while True:
+            pendente = self._inflight.get(key)
+            if pendente is not None:
+                try:
+                    return await asyncio.shield(pendente)
+                except _LiderCancelado:
+                    continue
+
+            cached = await self.get(key)
+            if cached is not None:
+                return cached
+
+            # Outra chamada pode ter assumido a chave durante o await acima
+            if key not in self._inflight:
+                break
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+            await self.backend.set(key, value, ttl_seconds)
+        except asyncio.CancelledError:
+            future.set_exception(_LiderCancelado())
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            del self._inflight[key]
+            # Evita aviso de exceção não recuperada quando ninguém esperava
+            if future.done() and not future.cancelled():
+                future.exception()
+
+    async def _varredura(self, intervalo: float):
+        while True:
+            await asyncio.sleep(intervalo)
+            try:
+                await self.backend.remover_expirados()
+            except Exception as e:
+                print(f"⚠️  Falha na varredura do cache: {e}")
+
+    def iniciar_varredura(self, intervalo: float = 60):
+        """Inicia a remoção periódica de entradas expiradas"""
+        self._sweeper = asyncio.create_task(self._varredura(intervalo))
+
+    async def close(self):
+        for tarefa in (self._sweeper, self._descarte):
+            if tarefa:
+                tarefa.cancel()
+                try:
+                    await tarefa
+                except asyncio.CancelledError:
+                    pass
+        await self.backend.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de uso do cache"""
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            **self.backend.stats(),
+        }
+
+
+def criar_cache(settings) -> Cache:
+    """Cria o cache conforme CACHE_BACKEND (memory, sqlite ou redis)"""
+    if settings.CACHE_BACKEND == "redis":
+        backend = RedisBackend(settings.CACHE_REDIS_URL, settings.CACHE_KEY_PREFIX)
+    elif settings.CACHE_BACKEND == "sqlite":
+        backend = SQLiteBackend(settings.CACHE_SQLITE_PATH, settings.CACHE_MAX_ENTRIES)
+    elif settings.CACHE_BACKEND == "memory":
+        backend = MemoryBackend(settings.CACHE_MAX_ENTRIES, settings.CACHE_MAX_BYTES)
+    else:
+        raise ValueError(f"CACHE_BACKEND inválido: {settings.CACHE_BACKEND}")
+    return Cache(backend)
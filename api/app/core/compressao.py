@@ -0,0 +1,218 @@
+"""
+Compressão das respostas (gzip e, se o pacote estiver instalado, brotli)
+
+- `CompressaoMiddleware` comprime respostas acima de um tamanho mínimo,
+  conforme o Accept-Encoding do cliente (inclusive respostas em streaming)
+- `CorpoCodificado` guarda no cache as variantes já comprimidas de um corpo,
+  para que hits não comprimam de novo
+"""
+import gzip
+import zlib
+from typing import Dict, Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.serializacao import JSONBytesResponse
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele, só gzip
+    brotli = None
+
+# Ordem de preferência em caso de empate no q-value
+CODIFICACOES = ("br", "gzip") if brotli else ("gzip",)
+
+TIPOS_COMPRESSIVEIS = (
+    "application/json",
+    "application/x-ndjson",
+    "text/",
+)
+
+
+def escolher_codificacao(
+    accept_encoding: str, opcoes: Iterable[str] = CODIFICACOES
+) -> Optional[str]:
+    """Melhor codificação aceita pelo cliente entre `opcoes`, ou None"""
+    aceitas: Dict[str, float] = {}
+    for parte in accept_encoding.split(","):
+        nome, _, params = parte.partition(";")
+        nome = nome.strip().lower()
+        if not nome:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        aceitas[nome] = q
+
+    melhor, melhor_q = None, 0.0
+    for codificacao in opcoes:
+        q = aceitas.get(codificacao, aceitas.get("*", 0.0))
+        if q > melhor_q:
+            melhor, melhor_q = codificacao, q
+    return melhor
+
+
+class _Compressor:
+    """Compressão incremental; cada bloco sai completo para o cliente"""
+
+    def __init__(self, codificacao: str, nivel_gzip: int, qualidade_brotli: int):
+        self.codificacao = codificacao
+        if codificacao == "br":
+            self._br = brotli.Compressor(quality=qualidade_brotli)
+        else:
+            self._gz = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def processar(self, dados: bytes) -> bytes:
+        if self.codificacao == "br":
+            return self._br.process(dados) + self._br.flush()
+        return self._gz.compress(dados) + self._gz.flush(zlib.Z_SYNC_FLUSH)
+
+    def finalizar(self, dados: bytes = b"") -> bytes:
+        if self.codificacao == "br":
+            return self._br.process(dados) + self._br.finish()
+        return self._gz.compress(dados) + self._gz.flush()
+
+
+def variar_por_codificacao(headers: MutableHeaders):
+    """Inclui Accept-Encoding no Vary (sem repetir se já estiver lá)"""
+    if "accept-encoding" not in headers.get("vary", "").lower():
+        headers.add_vary_header("Accept-Encoding")
+
+
+def _compressivel(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    return headers.get("content-type", "").startswith(TIPOS_COMPRESSIVEIS)
+
+
+class CompressaoMiddleware:
+    """
+    Middleware ASGI de compressão negociada. Respostas que já trazem
+    Content-Encoding (variantes pré-comprimidas) passam sem alteração, assim
+    como as de HEAD: sem corpo para comprimir, o Content-Length da rota é o
+    que vale.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimo: int = 1024,
+        nivel_gzip: int = 6,
+        qualidade_brotli: int = 4,
+    ):
+        self.app = app
+        self.minimo = minimo
+        self.nivel_gzip = nivel_gzip
+        self.qualidade_brotli = qualidade_brotli
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        codificacao = escolher_codificacao(
+            Headers(scope=scope).get("accept-encoding", "")
+        )
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        repassar = False
+
+        async def enviar(message: Message):
+            nonlocal inicio, compressor, repassar
+
+            if message["type"] == "http.response.start":
+                inicio = message
+                return
+            if message["type"] != "http.response.body" or repassar:
+                await send(message)
+                return
+
+            corpo = message.get("body", b"")
+            mais = message.get("more_body", False)
+
+            if compressor is None:
+                headers = MutableHeaders(raw=inicio["headers"])
+                # Tamanho pelo Content-Length (o corpo pode chegar em partes)
+                tamanho = headers.get("content-length")
+                tamanho = int(tamanho) if tamanho else (None if mais else len(corpo))
+                if not _compressivel(headers) or (
+                    tamanho is not None and tamanho < self.minimo
+                ):
+                    repassar = True
+                    await send(inicio)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(
+                    codificacao, self.nivel_gzip, self.qualidade_brotli
+                )
+                headers["Content-Encoding"] = codificacao
+                variar_por_codificacao(headers)
+
+                if not mais:
+                    # Resposta inteira em uma mensagem
+                    comprimido = compressor.finalizar(corpo)
+                    headers["Content-Length"] = str(len(comprimido))
+                    await send(inicio)
+                    await send({"type": "http.response.body", "body": comprimido})
+                    return
+
+                # Streaming: tamanho final desconhecido
+                del headers["Content-Length"]
+                await send(inicio)
+
+            if mais:
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": compressor.processar(corpo),
+                        "more_body": True,
+                    }
+                )
+            else:
+                await send(
+                    {"type": "http.response.body", "body": compressor.finalizar(corpo)}
+                )
+
+        await self.app(scope, receive, enviar)
+
+
+class CorpoCodificado:
+    """
+    Corpo JSON com as variantes comprimidas calculadas uma única vez
+    (na escrita do cache), com compressão máxima
+    """
+
+    def __init__(self, corpo: bytes, minimo: int = 1024):
+        self.variantes: Dict[str, bytes] = {"identity": corpo}
+        if len(corpo) >= minimo:
+            self.variantes["gzip"] = gzip.compress(corpo, compresslevel=9, mtime=0)
+            if brotli:
+                self.variantes["br"] = brotli.compress(corpo, quality=11)
+
+    @property
+    def nbytes(self) -> int:
+        """Tamanho total das variantes (usado pelo limite de bytes do cache)"""
+        return sum(len(variante) for variante in self.variantes.values())
+
+    def resposta(self, request: Request) -> JSONBytesResponse:
+        """Resposta com a melhor variante aceita pelo cliente"""
+        opcoes = [c for c in CODIFICACOES if c in self.variantes]
+        codificacao = escolher_codificacao(
+            request.headers.get("accept-encoding", ""), opcoes
+        )
+        headers = {"Vary": "Accept-Encoding"} if opcoes else {}
+        if codificacao is None:
+            return JSONBytesResponse(self.variantes["identity"], headers=headers)
+        headers["Content-Encoding"] = codificacao
+        return JSONBytesResponse(self.variantes[codificacao], headers=headers)
@@ -0,0 +1,69 @@
+"""
+Cache HTTP condicional (ETag / Last-Modified / 304)
+
+Os dados só mudam quando import_data.py roda, então os validadores são
+derivados da versão do dataset: enquanto ela não muda, a mesma URL tem
+sempre a mesma representação.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from starlette.requests import Request
+
+
+def gerar_etag(versao: str, request: Request) -> str:
+    """ETag fraco por URL (caminho + query) e versão do dataset"""
+    chave = f"{versao}|{request.url.path}?{request.url.query}"
+    return 'W/"' + hashlib.sha1(chave.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def ultima_modificacao(versao: str) -> Optional[datetime]:
+    """
+    Data da carga (UTC, sem frações de segundo), ou None se não houver carga
+    ou se a versão não tiver fuso (não dá para saber o instante)
+    """
+    try:
+        carga = datetime.fromisoformat(versao)
+    except ValueError:
+        return None
+    if carga.tzinfo is None:
+        return None
+    return carga.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def formatar_http_date(data: datetime) -> str:
+    return format_datetime(data, usegmt=True)
+
+
+def _etag_confere(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Comparação fraca: ignora o prefixo W/
+    candidatos = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidatos
+
+
+def nao_modificado(
+    request: Request, etag: str, modificado_em: Optional[datetime]
+) -> bool:
+    """
+    True se o cliente já tem a representação atual (RFC 9110: If-None-Match
+    tem precedência sobre If-Modified-Since)
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_confere(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and modificado_em is not None:
+        try:
+            desde = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if desde.tzinfo is None:
+            desde = desde.replace(tzinfo=timezone.utc)
+        return modificado_em <= desde
+
+    return False
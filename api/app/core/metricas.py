@@ -0,0 +1,314 @@
+"""
+Métricas no formato texto do Prometheus (endpoint /metrics)
+
+- `MetricasMiddleware`: latência por rota (template, não o caminho) e status,
+  requisições em andamento, consultas ao banco por requisição
+- `instrumentar_engine`: conta e cronometra as consultas via eventos do
+  SQLAlchemy, somando no contexto da requisição corrente
+- Coletores: valores lidos na hora da coleta (pool, cache, admissão)
+"""
+import math
+import time
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Limites (em segundos) dos buckets de latência
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+Rotulos = Tuple[str, ...]
+Amostra = Tuple[str, Dict[str, str], float]
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_valor(valor: float) -> str:
+    if isinstance(valor, int):
+        return str(valor)
+    if math.isinf(valor):
+        return "+Inf" if valor > 0 else "-Inf"
+    return repr(float(valor))
+
+
+def _formatar_amostra(nome: str, rotulos: Dict[str, str], valor: float) -> str:
+    if rotulos:
+        pares = ",".join(f'{k}="{_escapar(str(v))}"' for k, v in rotulos.items())
+        return f"{nome}{{{pares}}} {_formatar_valor(valor)}"
+    return f"{nome} {_formatar_valor(valor)}"
+
+
+# ----------------------------
+# Tipos de métrica
+# ----------------------------
+class Metrica(ABC):
+    """Família de métricas: nome, ajuda, rótulos e as amostras atuais"""
+
+    tipo = "untyped"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+
+    def _chave(self, valores: Dict[str, str]) -> Rotulos:
+        return tuple(str(valores[rotulo]) for rotulo in self.rotulos)
+
+    @abstractmethod
+    def amostras(self) -> Iterable[Amostra]:
+        """(nome, rótulos, valor) de cada série, lidos no momento da coleta"""
+
+
+class Contador(Metrica):
+    tipo = "counter"
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        super().__init__(nome, ajuda, rotulos)
+        self._valores: Dict[Rotulos, float] = {}
+
+    def inc(self, valor: float = 1, **rotulos):
+        chave = self._chave(rotulos)
+        self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def amostras(self):
+        for chave, valor in self._valores.items():
+            yield self.nome, dict(zip(self.rotulos, chave)), valor
+
+
+class Medidor(Metrica):
+    tipo = "gauge"
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        super().__init__(nome, ajuda, rotulos)
+        self._valores: Dict[Rotulos, float] = {}
+
+    def inc(self, valor: float = 1, **rotulos):
+        chave = self._chave(rotulos)
+        self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def dec(self, valor: float = 1, **rotulos):
+        self.inc(-valor, **rotulos)
+
+    def amostras(self):
+        for chave, valor in self._valores.items():
+            yield self.nome, dict(zip(self.rotulos, chave)), valor
+
+
+class Histograma(Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nome, ajuda, rotulos=(), buckets=BUCKETS_LATENCIA):
+        super().__init__(nome, ajuda, rotulos)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # chave -> (contagem por bucket, soma)
+        self._valores: Dict[Rotulos, Tuple[List[int], List[float]]] = {}
+
+    def observar(self, valor: float, **rotulos):
+        chave = self._chave(rotulos)
+        entrada = self._valores.get(chave)
+        if entrada is None:
+            entrada = self._valores[chave] = ([0] * len(self.buckets), [0.0])
+        contagens, soma = entrada
+        for i, limite in enumerate(self.buckets):
+            if valor <= limite:
+                contagens[i] += 1
+                break
+        soma[0] += valor
+
+    def amostras(self):
+        for chave, (contagens, soma) in self._valores.items():
+            rotulos = dict(zip(self.rotulos, chave))
+            acumulado = 0
+            for limite, contagem in zip(self.buckets, contagens):
+                acumulado += contagem
+                le = "+Inf" if math.isinf(limite) else repr(float(limite))
+                yield f"{self.nome}_bucket", {**rotulos, "le": le}, acumulado
+            yield f"{self.nome}_sum", rotulos, soma[0]
+            yield f"{self.nome}_count", rotulos, acumulado
+
+
+class Coletada(Metrica):
+    """Métrica calculada na hora da coleta por uma função"""
+
+    def __init__(
+        self,
+        nome: str,
+        ajuda: str,
+        tipo: str,
+        funcao: Callable[[], Iterable[Tuple[Dict[str, str], float]]],
+    ):
+        super().__init__(nome, ajuda)
+        self.tipo = tipo
+        self.funcao = funcao
+
+    def amostras(self):
+        for rotulos, valor in self.funcao():
+            yield self.nome, rotulos, valor
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._metricas: Dict[str, Metrica] = {}
+
+    def registrar(self, metrica: Metrica) -> Metrica:
+        self._metricas[metrica.nome] = metrica
+        return metrica
+
+    def coletar(self, nome: str, ajuda: str, tipo: str = "gauge"):
+        """Decorador: registra a função como métrica coletada"""
+
+        def decorador(funcao):
+            self.registrar(Coletada(nome, ajuda, tipo, funcao))
+            return funcao
+
+        return decorador
+
+    def exportar(self) -> str:
+        linhas: List[str] = []
+        for metrica in self._metricas.values():
+            try:
+                amostras = list(metrica.amostras())
+            except Exception as e:  # um coletor com erro não derruba /metrics
+                print(f"⚠️  Erro ao coletar {metrica.nome}: {e}")
+                continue
+            linhas.append(f"# HELP {metrica.nome} {metrica.ajuda}")
+            linhas.append(f"# TYPE {metrica.nome} {metrica.tipo}")
+            linhas.extend(_formatar_amostra(*amostra) for amostra in amostras)
+        return "\n".join(linhas) + "\n"
+
+
+registro = RegistroMetricas()
+
+http_latencia = registro.registrar(
+    Histograma(
+        "http_request_duration_seconds",
+        "Latência das requisições HTTP",
+        ("metodo", "rota", "status"),
+    )
+)
+http_em_andamento = registro.registrar(
+    Medidor("http_requests_in_flight", "Requisições HTTP em andamento", ("rota",))
+)
+db_consultas_requisicao = registro.registrar(
+    Histograma(
+        "http_request_db_queries",
+        "Consultas ao banco por requisição",
+        ("rota",),
+        BUCKETS_CONSULTAS,
+    )
+)
+db_tempo_requisicao = registro.registrar(
+    Histograma(
+        "http_request_db_seconds",
+        "Tempo total em consultas ao banco por requisição",
+        ("rota",),
+    )
+)
+db_consultas = registro.registrar(
+    Contador("db_queries_total", "Consultas executadas no banco", ("engine",))
+)
+db_latencia = registro.registrar(
+    Histograma("db_query_duration_seconds", "Duração das consultas", ("engine",))
+)
+
+
+# ----------------------------
+# Banco de dados
+# ----------------------------
+class _ConsultasRequisicao:
+    __slots__ = ("quantidade", "segundos")
+
+    def __init__(self):
+        self.quantidade = 0
+        self.segundos = 0.0
+
+
+# Acumulador da requisição corrente (o objeto é compartilhado com as tarefas
+# filhas, que herdam uma cópia do contexto)
+_consultas: ContextVar[Optional[_ConsultasRequisicao]] = ContextVar(
+    "consultas_requisicao", default=None
+)
+
+
+def instrumentar_engine(engine: Engine, nome: str) -> None:
+    """Conta e cronometra as consultas da engine (síncrona ou `.sync_engine`)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metricas_inicio", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        inicios = conn.info.get("metricas_inicio")
+        if not inicios:
+            return
+        duracao = time.perf_counter() - inicios.pop()
+        db_consultas.inc(engine=nome)
+        db_latencia.observar(duracao, engine=nome)
+
+        acumulado = _consultas.get()
+        if acumulado is not None:
+            acumulado.quantidade += 1
+            acumulado.segundos += duracao
+
+
+# ----------------------------
+# Middleware HTTP
+# ----------------------------
+class MetricasMiddleware:
+    """
+    Middleware ASGI. A rota é o template (`/api/operadoras/{cnpj}`), para
+    que o número de séries não cresça com os parâmetros.
+    """
+
+    def __init__(self, app: ASGIApp, rotas: List[BaseRoute]):
+        self.app = app
+        self.rotas = rotas
+
+    def _rota(self, scope: Scope) -> str:
+        for rota in self.rotas:
+            correspondencia, _ = rota.matches(scope)
+            if correspondencia == Match.FULL:
+                return getattr(rota, "path", "desconhecida")
+        return "desconhecida"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rota = self._rota(scope)
+        status_code = 500
+        acumulado = _ConsultasRequisicao()
+        token = _consultas.set(acumulado)
+
+        async def enviar(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_em_andamento.inc(rota=rota)
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            http_em_andamento.dec(rota=rota)
+            http_latencia.observar(
+                time.perf_counter() - inicio,
+                metodo=scope["method"],
+                rota=rota,
+                status=str(status_code),
+            )
+            db_consultas_requisicao.observar(acumulado.quantidade, rota=rota)
+            db_tempo_requisicao.observar(acumulado.segundos, rota=rota)
+            _consultas.reset(token)
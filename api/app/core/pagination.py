@@ -0,0 +1,53 @@
+"""
+Paginação por cursor (keyset) para listagens ordenadas por (razao_social, id)
+"""
+import base64
+import json
+from typing import Optional, Tuple
+
+# Direções do cursor
+NEXT = "n"
+PREV = "p"
+
+
+class CursorInvalido(ValueError):
+    """Cursor recebido não pôde ser decodificado"""
+
+
+def encode_cursor(razao_social: str, id: int, direcao: str) -> str:
+    """Gera cursor opaco a partir da chave da linha de borda da página"""
+    payload = json.dumps([razao_social, id, direcao], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int, str]:
+    """Decodifica cursor em (razao_social, id, direção)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        razao_social, id, direcao = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(razao_social, str) or not isinstance(id, int):
+            raise ValueError
+        if direcao not in (NEXT, PREV):
+            raise ValueError
+        return razao_social, id, direcao
+    except (ValueError, TypeError, json.JSONDecodeError) as e:
+        raise CursorInvalido("Cursor inválido") from e
+
+
+def _chave(item) -> Tuple[str, int]:
+    """(razao_social, id) de um objeto ORM/schema ou de um dict"""
+    if isinstance(item, dict):
+        return item["razao_social"], item["id"]
+    return item.razao_social, item.id
+
+
+def cursores_da_pagina(
+    itens: list, has_next: bool, has_prev: bool
+) -> Tuple[Optional[str], Optional[str]]:
+    """Retorna (next_cursor, prev_cursor) para as bordas de uma página"""
+    if not itens:
+        return None, None
+
+    next_cursor = encode_cursor(*_chave(itens[-1]), NEXT) if has_next else None
+    prev_cursor = encode_cursor(*_chave(itens[0]), PREV) if has_prev else None
+    return next_cursor, prev_cursor
@@ -0,0 +1,25 @@
+"""
+Serialização JSON das respostas
+
+- Respostas comuns usam ORJSONResponse (default_response_class do app)
+- Rotas cacheáveis guardam o corpo já codificado; um hit do cache devolve
+  os bytes direto, sem validação de schema nem codificação
+"""
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import Response
+
+
+class JSONBytesResponse(Response):
+    """Resposta com corpo JSON já codificado"""
+
+    media_type = "application/json"
+
+
+def codificar(valor: Any) -> bytes:
+    """
+    JSON de um schema (ou lista/dict de schemas), no mesmo formato que o
+    FastAPI gera para o response_model (Decimal como string, datas ISO 8601)
+    """
+    return pydantic_core.to_json(valor)
@@ -2,34 +2,110 @@
 ANS Analytics API - Backend FastAPI (Versão Simplificada)
 """
 
+import asyncio
 import os
 from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import List, Literal, Optional
 
-import pandas as pd
-from fastapi import Depends, FastAPI, HTTPException, Query, status
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from sqlalchemy import distinct, func, text
-from sqlalchemy.orm import Session
+from fastapi.responses import (
+    JSONResponse,
+    ORJSONResponse,
+    PlainTextResponse,
+    StreamingResponse,
+)
+from sqlalchemy import distinct, func, or_, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Importações locais
-from app.api.database import SessionLocal, engine, get_db
-from app.api.models import Base, DespesaAgregada, DespesaConsolidada, Operadora
+from app.api.aquecimento import aquecer
+from app.api.busca import consulta_busca
+from app.api.contagem import contar_estimado, contar_exato
+from app.api.database import (
+    ReadSessionLocal,
+    async_engine,
+    engines_nomeados,
+    estado_replicas,
+    fechar_engines,
+    get_db,
+    get_read_db,
+)
+from app.api.dataset import VersaoDataset
+from app.api.diagnostico import (
+    DiagnosticoMiddleware,
+    instrumentar_engine as instrumentar_diagnostico,
+)
+from app.api.exportacao import (
+    FORMATOS,
+    FiltrosInvalidos,
+    consulta_exportacao,
+    exportar,
+    validar_filtros,
+)
+from app.api.projecao import (
+    CAMPOS_BUSCA,
+    CAMPOS_CURSOR,
+    CAMPOS_LISTAGEM,
+    CamposInvalidos,
+    colunas_operadora,
+    parse_fields,
+    recortar,
+)
+from app.api.ranking import METRICAS as METRICAS_RANKING
+from app.api.ranking import consulta_pagina, consulta_total, particao_ranking
+from app.api.series import consulta_serie, montar_series
+from app.api.registro import GerenciadorRegistro, RegistroOperadoras
+from app.api.models import (
+    Base,
+    DespesaAgregada,
+    DespesaConsolidada,
+    EstatisticaSnapshot,
+    Operadora,
+)
+from app.core.admissao import AdmissaoMiddleware, ControleAdmissao
+from app.core.cache import Cache, MemoryBackend, chave_versionada, criar_cache
+from app.core.compressao import (
+    CompressaoMiddleware,
+    CorpoCodificado,
+    variar_por_codificacao,
+)
 from app.core.config import settings
+from app.core.metricas import (
+    CONTENT_TYPE as METRICAS_CONTENT_TYPE,
+    MetricasMiddleware,
+    instrumentar_engine,
+    registro as registro_metricas,
+)
+from app.core.http_cache import (
+    formatar_http_date,
+    gerar_etag,
+    nao_modificado,
+    ultima_modificacao,
+)
+from app.core.serializacao import JSONBytesResponse, codificar
+from app.core.pagination import (
+    NEXT,
+    CursorInvalido,
+    cursores_da_pagina,
+    decode_cursor,
+)
 from app.schemas import (
+    BuscaResponse,
     DespesaResponse,
     EstatisticaResponse,
+    LoteRequest,
+    LoteResponse,
     OperadoraDetailResponse,
+    OperadoraLoteResponse,
     OperadoraResponse,
     PaginatedResponse,
+    RankingItemResponse,
+    SerieConta,
+    SerieDespesasResponse,
 )
 
-# Criar tabelas se não existirem
-Base.metadata.create_all(bind=engine)
-
-
 # Lifespan manager simplificado
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -38,13 +114,52 @@ async def lifespan(app: FastAPI):
     print(f"📊 Database: {settings.DATABASE_URL}")
     print(f"🌐 Environment: {settings.ENVIRONMENT}")
 
-    # Criar cache em memória simples
-    app.state.cache = SimpleCache()
+    # Esquema é responsabilidade de scripts/script.sql e do import; criar as
+    # tabelas aqui só quando pedido (ambiente de desenvolvimento)
+    if settings.DB_CREATE_SCHEMA:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    # Cache (backend conforme CACHE_BACKEND, com varredura periódica de expirados)
+    app.state.cache = criar_cache(settings)
+    print(f"🗄️  Cache: {settings.CACHE_BACKEND}")
+    app.state.cache.iniciar_varredura(settings.CACHE_SWEEP_SECONDS)
+
+    # Versão do dataset (invalida caches derivados dos dados após import):
+    # ao mudar, as entradas de versões anteriores saem do cache
+    app.state.dataset = VersaoDataset(settings.DATASET_VERSION_CHECK_SECONDS)
+    app.state.dataset.ao_mudar(app.state.cache.descartar_versoes)
+
+    # Registro de operadoras em memória (opcional)
+    app.state.registro = None
+    if settings.REGISTRY_ENABLED:
+        app.state.registro = GerenciadorRegistro(
+            app.state.dataset, settings.REGISTRY_REFRESH_SECONDS
+        )
+        await app.state.registro.iniciar()
+
+    # Aquecimento: pool aberto e caches quentes antes de aceitar tráfego
+    if settings.WARMUP_ENABLED:
+        try:
+            await asyncio.wait_for(
+                aquecer(
+                    app,
+                    settings.WARMUP_PATHS,
+                    min(settings.WARMUP_CONNECTIONS, settings.DB_POOL_SIZE),
+                ),
+                settings.WARMUP_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            print("⚠️  Aquecimento interrompido por tempo; seguindo com caches frios")
 
     yield
 
     # Shutdown
     print("👋 Shutting down ANS Analytics API...")
+    await app.state.cache.close()
+    if app.state.registro:
+        await app.state.registro.parar()
+    await fechar_engines()
 
 
 # Inicialização do FastAPI
@@ -53,11 +168,103 @@ app = FastAPI(
     description="API para análise de despesas de operadoras de saúde",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if settings.ENVIRONMENT != "production" else None,
     redoc_url="/redoc" if settings.ENVIRONMENT != "production" else None,
 )
 
-# CORS Middleware
+# Rotas cujas respostas só mudam com a carga dos dados
+ROTAS_CACHEAVEIS = (
+    "/api/operadoras",
+    "/api/estatisticas",
+    "/api/despesas",
+    "/api/ranking",
+)
+
+# Rotas sem parâmetros que sempre existem: o 304 pode ser dado sem executá-las.
+# Nas demais (recurso por CNPJ, filtros validados) a rota roda e o 304 só
+# substitui uma resposta 200.
+ROTAS_SEMPRE_OK = ("/api/estatisticas",)
+
+
+# Cache HTTP condicional: validadores pela versão do dataset
+@app.middleware("http")
+async def cache_condicional(request: Request, call_next):
+    if request.method not in ("GET", "HEAD") or not request.url.path.startswith(
+        ROTAS_CACHEAVEIS
+    ):
+        return await call_next(request)
+
+    if not hasattr(app.state, "dataset"):
+        app.state.dataset = VersaoDataset(settings.DATASET_VERSION_CHECK_SECONDS)
+    try:
+        async with ReadSessionLocal() as db:
+            versao = await app.state.dataset.atual(db)
+    except Exception:
+        # Sem versão (banco lento/indisponível): a rota responde sem validadores
+        return await call_next(request)
+
+    etag = gerar_etag(versao, request)
+    modificado_em = ultima_modificacao(versao)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.HTTP_CACHE_MAX_AGE}",
+    }
+    if modificado_em is not None:
+        headers["Last-Modified"] = formatar_http_date(modificado_em)
+
+    nao_mudou = nao_modificado(request, etag, modificado_em)
+    if nao_mudou and request.url.path.rstrip("/") in ROTAS_SEMPRE_OK and not request.url.query:
+        return _resposta_304(headers)
+
+    response = await call_next(request)
+    if response.status_code != status.HTTP_200_OK:
+        return response
+    if nao_mudou:
+        # Descarta o corpo já gerado: o cliente tem a representação atual
+        async for _ in response.body_iterator:
+            pass
+        return _resposta_304(headers, response.headers.get("vary"))
+    response.headers.update(headers)
+    variar_por_codificacao(response.headers)
+    return response
+
+
+def _resposta_304(headers: dict, vary: Optional[str] = None) -> Response:
+    """
+    304 com os mesmos ETag, Last-Modified, Cache-Control e Vary que a
+    resposta 200 teria (RFC 9110, 15.4.5). As rotas cacheáveis variam pelo
+    Accept-Encoding (variantes comprimidas), mesmo quando a 200 vem da rota
+    """
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if vary:
+        response.headers["Vary"] = vary
+    variar_por_codificacao(response.headers)
+    return response
+
+
+# Compressão negociada (gzip/brotli) acima de COMPRESSION_MIN_BYTES
+app.add_middleware(CompressaoMiddleware, minimo=settings.COMPRESSION_MIN_BYTES)
+
+# Controle de admissão: limita as rotas caras antes de qualquer trabalho
+# (inclusive a consulta de versão do cache condicional)
+admissao = ControleAdmissao(
+    settings.ADMISSION_LIMITS if settings.ADMISSION_ENABLED else {},
+    espera_max=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+)
+app.add_middleware(AdmissaoMiddleware, controle=admissao)
+
+# Diagnóstico de consultas (consultas lentas e orçamento por requisição)
+if settings.DB_SLOW_QUERY_MS or settings.DB_QUERY_BUDGET:
+    for _nome, _engine in engines_nomeados().items():
+        instrumentar_diagnostico(_engine, _nome)
+    app.add_middleware(DiagnosticoMiddleware, orcamento=settings.DB_QUERY_BUDGET)
+
+# Métricas: por fora da admissão, para contar também as requisições recusadas
+app.add_middleware(MetricasMiddleware, rotas=app.router.routes)
+
+# CORS Middleware (registrado por último: envolve também as respostas 304)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
@@ -67,34 +274,39 @@ app.add_middleware(
 )
 
 
-# Cache simples em memória
-class SimpleCache:
-    def __init__(self):
-        self._cache: Dict[str, Dict[str, Any]] = {}
+# Dependência para cache
+def get_cache():
+    return (
+        app.state.cache
+        if hasattr(app.state, "cache")
+        else Cache(MemoryBackend(settings.CACHE_MAX_ENTRIES, settings.CACHE_MAX_BYTES))
+    )
 
-    def get(self, key: str):
-        """Obtém valor do cache se não expirou"""
-        if key in self._cache:
-            data, expiry = self._cache[key]
-            if datetime.now().timestamp() < expiry:
-                return data
-            else:
-                del self._cache[key]
-        return None
 
-    def set(self, key: str, value: Any, ttl_seconds: int = 300):
-        """Define valor no cache com TTL"""
-        expiry = datetime.now().timestamp() + ttl_seconds
-        self._cache[key] = (value, expiry)
+# Dependência para o registro em memória (None se desativado ou ainda não
+# recarregado para a versão atual do dataset: a rota consulta o banco)
+def get_registro() -> Optional[RegistroOperadoras]:
+    gerenciador = getattr(app.state, "registro", None)
+    return gerenciador.vigente() if gerenciador else None
 
-    def clear(self):
-        """Limpa cache"""
-        self._cache.clear()
 
+# Dependência para versão do dataset
+async def get_dataset_versao(db: AsyncSession = Depends(get_read_db)) -> str:
+    if not hasattr(app.state, "dataset"):
+        app.state.dataset = VersaoDataset(settings.DATASET_VERSION_CHECK_SECONDS)
+    return await app.state.dataset.atual(db)
 
-# Dependência para cache
-def get_cache():
-    return app.state.cache if hasattr(app.state, "cache") else SimpleCache()
+
+def responder_pagina(itens: List[dict], campos: Optional[tuple], **meta):
+    """
+    Página da listagem: validada pelo schema, ou, com `fields`, montada
+    direto com os campos pedidos
+    """
+    if campos is None:
+        return PaginatedResponse(data=itens, **meta)
+    pagina = PaginatedResponse(data=[], **meta).model_dump()
+    pagina["data"] = [recortar(item, campos) for item in itens]
+    return JSONBytesResponse(codificar(pagina))
 
 
 # ----------------------------
@@ -107,47 +319,160 @@ async def listar_operadoras(
     razao_social: Optional[str] = Query(None, description="Filtrar por razão social"),
     uf: Optional[str] = Query(None, description="Filtrar por UF"),
     modalidade: Optional[str] = Query(None, description="Filtrar por modalidade"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        None, description="Cursor opaco (next_cursor/prev_cursor) da página anterior"
+    ),
+    total_estimado: bool = Query(
+        False, description="Usar estimativa do planner para o total (filtros caros)"
+    ),
+    fields: Optional[str] = Query(
+        None, description="Campos de cada operadora, separados por vírgula (ex.: cnpj,razao_social,uf)"
+    ),
+    db: AsyncSession = Depends(get_read_db),
+    cache: Cache = Depends(get_cache),
+    versao: str = Depends(get_dataset_versao),
+    registro: Optional[RegistroOperadoras] = Depends(get_registro),
 ):
     """
-    Lista todas as operadoras com paginação
+    Lista todas as operadoras com paginação.
+
+    Sem `cursor`, usa a paginação por número de página (offset). Com `cursor`,
+    usa paginação keyset em (razao_social, id), com custo constante em
+    qualquer profundidade; nesse modo `page` é apenas ecoado na resposta.
+
+    O total é cacheado por conjunto de filtros normalizado e versão do
+    dataset, então navegar entre páginas não reconta a tabela. Com o registro
+    em memória ativo, a página é montada sem consultar o banco.
+
+    Só as colunas da resposta são lidas; `fields` restringe os campos de
+    cada operadora.
     """
     try:
-        query = db.query(Operadora)
+        try:
+            campos = parse_fields(fields, CAMPOS_LISTAGEM)
+        except CamposInvalidos as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        cursor_decodificado = None
+        if cursor:
+            try:
+                cursor_decodificado = decode_cursor(cursor)
+            except CursorInvalido as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+                )
+
+        if registro is not None:
+            pagina = registro.listar(
+                razao_social, uf, modalidade, page, limit, cursor_decodificado
+            )
+            if pagina is not None:
+                next_cursor, prev_cursor = cursores_da_pagina(
+                    pagina.itens, pagina.has_next, pagina.has_prev
+                )
+                return responder_pagina(
+                    pagina.itens,
+                    campos,
+                    total=pagina.total,
+                    page=page,
+                    limit=limit,
+                    total_pages=(pagina.total + limit - 1) // limit,
+                    has_next=pagina.has_next,
+                    has_prev=pagina.has_prev,
+                    next_cursor=next_cursor,
+                    prev_cursor=prev_cursor,
+                )
+
+        # Colunas da resposta (ou de `fields`) + chave dos cursores
+        lidos = tuple(dict.fromkeys((*(campos or CAMPOS_LISTAGEM), *CAMPOS_CURSOR)))
+        query = select(*colunas_operadora(lidos))
 
         # Aplicar filtros
         if razao_social:
-            query = query.filter(Operadora.razao_social.ilike(f"%{razao_social}%"))
+            query = query.where(Operadora.razao_social.icontains(razao_social, autoescape=True))
         if uf:
-            query = query.filter(Operadora.uf == uf.upper())
+            query = query.where(Operadora.uf == uf.upper())
         if modalidade:
-            query = query.filter(Operadora.modalidade.ilike(f"%{modalidade}%"))
+            query = query.where(Operadora.modalidade.icontains(modalidade, autoescape=True))
 
-        # Calcular totais
-        total = query.count()
-
-        # Paginação offset-based
-        offset = (page - 1) * limit
+        # Calcular totais (cache por filtros normalizados + versão do dataset)
+        filtros = (
+            (razao_social or "").strip().lower(),
+            (uf or "").strip().upper(),
+            (modalidade or "").strip().lower(),
+        )
+        count_key = chave_versionada("total_operadoras", versao, total_estimado, *filtros)
 
-        # Ordenação padrão
-        query = query.order_by(Operadora.razao_social)
+        async def contar():
+            if total_estimado and (razao_social or modalidade):
+                return await contar_estimado(db, query)
+            return await contar_exato(db, query)
 
-        # Aplicar paginação
-        operadoras = query.offset(offset).limit(limit).all()
+        total = await cache.get_or_set(
+            count_key, contar, ttl_seconds=settings.DATASET_CACHE_TTL_SECONDS
+        )
 
         # Calcular total de páginas
         total_pages = (total + limit - 1) // limit  # Ceil division
 
-        return PaginatedResponse(
-            data=operadoras,
+        chave = tuple_(Operadora.razao_social, Operadora.id)
+
+        if cursor_decodificado:
+            # Paginação keyset a partir da borda da página anterior
+            cursor_razao, cursor_id, direcao = cursor_decodificado
+
+            if direcao == NEXT:
+                query = query.where(chave > tuple_(cursor_razao, cursor_id)).order_by(
+                    Operadora.razao_social, Operadora.id
+                )
+            else:
+                query = query.where(chave < tuple_(cursor_razao, cursor_id)).order_by(
+                    Operadora.razao_social.desc(), Operadora.id.desc()
+                )
+
+            # Buscar um item extra para saber se há mais páginas nessa direção
+            result = await db.execute(query.limit(limit + 1))
+            operadoras = [dict(linha) for linha in result.mappings()]
+            tem_mais = len(operadoras) > limit
+            operadoras = operadoras[:limit]
+
+            if direcao == NEXT:
+                has_next, has_prev = tem_mais, True
+            else:
+                operadoras.reverse()
+                has_next, has_prev = True, tem_mais
+        else:
+            # Paginação offset-based
+            offset = (page - 1) * limit
+
+            # Ordenação padrão (id desempata razões sociais iguais)
+            query = query.order_by(Operadora.razao_social, Operadora.id)
+
+            # Aplicar paginação (item extra: has_next não depende do total,
+            # que pode ser estimado)
+            result = await db.execute(query.offset(offset).limit(limit + 1))
+            operadoras = [dict(linha) for linha in result.mappings()]
+            has_next, has_prev = len(operadoras) > limit, page > 1
+            operadoras = operadoras[:limit]
+
+        next_cursor, prev_cursor = cursores_da_pagina(operadoras, has_next, has_prev)
+
+        return responder_pagina(
+            operadoras,
+            campos,
             total=total,
             page=page,
             limit=limit,
             total_pages=total_pages,
-            has_next=page < total_pages,
-            has_prev=page > 1,
+            has_next=has_next,
+            has_prev=has_prev,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
+            total_estimado=total_estimado and bool(razao_social or modalidade),
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -160,33 +485,55 @@ async def listar_operadoras(
 # ----------------------------
 @app.get("/api/operadoras/{cnpj}", response_model=OperadoraDetailResponse)
 async def detalhar_operadora(
-    cnpj: str, db: Session = Depends(get_db), cache: SimpleCache = Depends(get_cache)
+    cnpj: str,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    cache: Cache = Depends(get_cache),
+    versao: str = Depends(get_dataset_versao),
+    registro: Optional[RegistroOperadoras] = Depends(get_registro),
 ):
     """
     Retorna detalhes de uma operadora específica
     """
     try:
-        # Verificar cache primeiro
-        cache_key = f"operadora_{cnpj}"
-        cached = cache.get(cache_key)
-        if cached:
-            return cached
+        # Registro em memória, quando ativo, responde sem banco nem cache
+        if registro is not None:
+            corpo = registro.detalhe_json("".join(filter(str.isdigit, cnpj)))
+            if corpo is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Operadora com CNPJ {cnpj} não encontrada",
+                )
+            return JSONBytesResponse(corpo)
 
         # Normalizar CNPJ (apenas números)
         cnpj_clean = "".join(filter(str.isdigit, cnpj))
 
-        operadora = db.query(Operadora).filter(Operadora.cnpj == cnpj_clean).first()
-
-        if not operadora:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Operadora com CNPJ {cnpj} não encontrada",
+        async def carregar():
+            operadora = await db.scalar(
+                select(Operadora).where(Operadora.cnpj == cnpj_clean).limit(1)
             )
 
-        # Armazenar em cache por 5 minutos
-        cache.set(cache_key, operadora, ttl_seconds=300)
+            if not operadora:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Operadora com CNPJ {cnpj} não encontrada",
+                )
 
-        return operadora
+            # Corpo já codificado (e comprimido): hits do cache não
+            # serializam nem comprimem de novo
+            return CorpoCodificado(
+                codificar(OperadoraDetailResponse.model_validate(operadora)),
+                settings.COMPRESSION_MIN_BYTES,
+            )
+
+        # Cache por versão do dataset; requisições simultâneas fazem uma única consulta
+        corpo = await cache.get_or_set(
+            chave_versionada("operadora", versao, cnpj_clean),
+            carregar,
+            ttl_seconds=settings.DATASET_CACHE_TTL_SECONDS,
+        )
+        return corpo.resposta(request)
 
     except HTTPException:
         raise
@@ -207,7 +554,8 @@ async def historico_despesas(
     trimestre: Optional[int] = Query(
         None, ge=1, le=4, description="Filtrar por trimestre"
     ),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    registro: Optional[RegistroOperadoras] = Depends(get_registro),
 ):
     """
     Retorna histórico de despesas da operadora
@@ -215,28 +563,39 @@ async def historico_despesas(
     try:
         # Buscar operadora primeiro para obter registro_ans
         cnpj_clean = "".join(filter(str.isdigit, cnpj))
-        operadora = db.query(Operadora).filter(Operadora.cnpj == cnpj_clean).first()
+        if registro is not None:
+            operadora = registro.por_cnpj.get(cnpj_clean)
+            registro_ans = operadora["registro_operadora"] if operadora else None
+        else:
+            registro_ans = await db.scalar(
+                select(Operadora.registro_operadora)
+                .where(Operadora.cnpj == cnpj_clean)
+                .limit(1)
+            )
 
-        if not operadora:
+        if not registro_ans:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Operadora com CNPJ {cnpj} não encontrada",
             )
 
         # Buscar despesas consolidadas
-        query = db.query(DespesaConsolidada).filter(
-            DespesaConsolidada.reg_ans == operadora.registro_operadora
+        query = select(DespesaConsolidada).where(
+            DespesaConsolidada.reg_ans == registro_ans
         )
 
         if ano:
-            query = query.filter(DespesaConsolidada.ano == ano)
+            query = query.where(DespesaConsolidada.ano == ano)
         if trimestre:
-            query = query.filter(DespesaConsolidada.trimestre == trimestre)
+            query = query.where(DespesaConsolidada.trimestre == trimestre)
 
         # Ordenar por ano e trimestre
-        despesas = query.order_by(
-            DespesaConsolidada.ano.desc(), DespesaConsolidada.trimestre.desc()
-        ).all()
+        result = await db.execute(
+            query.order_by(
+                DespesaConsolidada.ano.desc(), DespesaConsolidada.trimestre.desc()
+            )
+        )
+        despesas = result.scalars().all()
 
         return despesas
 
@@ -249,108 +608,501 @@ async def historico_despesas(
         )
 
 
+# ----------------------------
+# ROTA 3.1: POST /api/operadoras/lote
+# ----------------------------
+@app.post("/api/operadoras/lote", response_model=LoteResponse)
+async def consultar_lote(
+    lote: LoteRequest,
+    db: AsyncSession = Depends(get_read_db),
+    registro: Optional[RegistroOperadoras] = Depends(get_registro),
+):
+    """
+    Detalhes (e opcionalmente o histórico de despesas) de várias operadoras
+    de uma vez, por CNPJ e/ou registro ANS.
+
+    Resolve tudo com uma consulta por tabela, na ordem dos identificadores
+    enviados; os que não existem voltam em `nao_encontrados`.
+    """
+    # Normalizar e remover repetidos, mantendo a ordem
+    cnpjs = list(dict.fromkeys("".join(filter(str.isdigit, c)) for c in lote.cnpjs))
+    registros = list(dict.fromkeys(r.strip() for r in lote.registros_ans))
+    cnpjs = [c for c in cnpjs if c]
+    registros = [r for r in registros if r]
+
+    if len(cnpjs) + len(registros) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo de {settings.BATCH_MAX_ITEMS} identificadores por lote",
+        )
+
+    try:
+        # Operadoras: registro em memória ou uma única consulta
+        if registro is not None:
+            por_cnpj = {c: registro.por_cnpj[c] for c in cnpjs if c in registro.por_cnpj}
+            por_registro = {
+                r: registro.por_registro[r] for r in registros if r in registro.por_registro
+            }
+        else:
+            filtros = []
+            if cnpjs:
+                filtros.append(Operadora.cnpj.in_(cnpjs))
+            if registros:
+                filtros.append(Operadora.registro_operadora.in_(registros))
+
+            encontradas = (
+                (await db.scalars(select(Operadora).where(or_(*filtros)))).all()
+                if filtros
+                else []
+            )
+            por_cnpj = {op.cnpj: op for op in encontradas}
+            por_registro = {op.registro_operadora: op for op in encontradas}
+
+        operadoras = {}
+        nao_encontrados = []
+        for chave, indice in [(c, por_cnpj) for c in cnpjs] + [
+            (r, por_registro) for r in registros
+        ]:
+            operadora = indice.get(chave)
+            if operadora is None:
+                nao_encontrados.append(chave)
+                continue
+            item = OperadoraLoteResponse.model_validate(operadora)
+            operadoras.setdefault(item.registro_operadora, item)
+
+        # Despesas: uma única consulta para todas as operadoras encontradas
+        if lote.incluir_despesas and operadoras:
+            query = select(DespesaConsolidada).where(
+                DespesaConsolidada.reg_ans.in_(list(operadoras))
+            )
+            if lote.ano:
+                query = query.where(DespesaConsolidada.ano == lote.ano)
+            if lote.trimestre:
+                query = query.where(DespesaConsolidada.trimestre == lote.trimestre)
+
+            for item in operadoras.values():
+                item.despesas = []
+            result = await db.scalars(
+                query.order_by(
+                    DespesaConsolidada.ano.desc(),
+                    DespesaConsolidada.trimestre.desc(),
+                    DespesaConsolidada.id,
+                )
+            )
+            for despesa in result:
+                operadoras[despesa.reg_ans].despesas.append(
+                    DespesaResponse.model_validate(despesa)
+                )
+
+        return LoteResponse(
+            operadoras=list(operadoras.values()), nao_encontrados=nao_encontrados
+        )
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro na consulta em lote: {str(e)}",
+        )
+
+
+# ----------------------------
+# ROTA 3.2: GET /api/exportar/{tabela}
+# ----------------------------
+@app.get("/api/exportar/{tabela}")
+async def exportar_despesas(
+    tabela: Literal["despesas_consolidadas", "despesas_agregadas"],
+    formato: Literal["ndjson", "csv"] = Query("ndjson", description="Formato do arquivo"),
+    cnpj: Optional[str] = Query(None, description="Filtrar por CNPJ"),
+    reg_ans: Optional[str] = Query(None, description="Filtrar por registro ANS"),
+    ano: Optional[int] = Query(None, description="Filtrar por ano (consolidadas)"),
+    trimestre: Optional[int] = Query(
+        None, ge=1, le=4, description="Filtrar por trimestre (consolidadas)"
+    ),
+    uf: Optional[str] = Query(None, description="Filtrar por UF (agregadas)"),
+    razao_social: Optional[str] = Query(
+        None, description="Filtrar por razão social (agregadas)"
+    ),
+    db: AsyncSession = Depends(get_read_db),
+    registro: Optional[RegistroOperadoras] = Depends(get_registro),
+):
+    """
+    Exporta as despesas filtradas em NDJSON ou CSV (separado por `;`).
+
+    As linhas são lidas do banco com cursor no servidor e enviadas conforme
+    chegam, então o consumo de memória é constante para qualquer volume.
+    Filtros que não existem na tabela pedida são rejeitados com 400.
+    """
+    try:
+        validar_filtros(
+            tabela,
+            cnpj=cnpj,
+            reg_ans=reg_ans,
+            ano=ano,
+            trimestre=trimestre,
+            uf=uf,
+            razao_social=razao_social,
+        )
+    except FiltrosInvalidos as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if cnpj:
+        cnpj_clean = "".join(filter(str.isdigit, cnpj))
+        if registro is not None:
+            operadora = registro.por_cnpj.get(cnpj_clean)
+            reg_ans = operadora["registro_operadora"] if operadora else None
+        else:
+            reg_ans = await db.scalar(
+                select(Operadora.registro_operadora)
+                .where(Operadora.cnpj == cnpj_clean)
+                .limit(1)
+            )
+        if not reg_ans:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Operadora com CNPJ {cnpj} não encontrada",
+            )
+
+    query = consulta_exportacao(tabela, reg_ans, ano, trimestre, uf, razao_social)
+
+    return StreamingResponse(
+        exportar(query, formato, settings.EXPORT_FETCH_SIZE),
+        media_type=FORMATOS[formato],
+        headers={
+            "Content-Disposition": f'attachment; filename="{tabela}.{formato}"'
+        },
+    )
+
+
+# ----------------------------
+# ROTA 3.3: GET /api/despesas/serie
+# ----------------------------
+@app.get("/api/despesas/serie", response_model=SerieDespesasResponse)
+async def serie_despesas(
+    request: Request,
+    cnpj: Optional[str] = Query(None, description="Filtrar por CNPJ da operadora"),
+    reg_ans: Optional[str] = Query(None, description="Filtrar por registro ANS"),
+    uf: Optional[str] = Query(None, description="Filtrar por UF da operadora"),
+    modalidade: Optional[str] = Query(None, description="Filtrar por modalidade"),
+    nivel: Optional[int] = Query(
+        None, ge=1, le=20, description="Dígitos do prefixo da conta contábil"
+    ),
+    ano_inicio: Optional[int] = Query(None, description="Ano inicial"),
+    ano_fim: Optional[int] = Query(None, description="Ano final"),
+    db: AsyncSession = Depends(get_read_db),
+    cache: Cache = Depends(get_cache),
+    versao: str = Depends(get_dataset_versao),
+    registro: Optional[RegistroOperadoras] = Depends(get_registro),
+):
+    """
+    Despesas por trimestre (e por prefixo de conta contábil, com `nivel`),
+    agregadas no banco para uma operadora, UF ou modalidade (ou o mercado
+    todo, sem filtros).
+
+    Resposta em colunas: `periodos` ("2025T1", ...), `total` por período e,
+    para cada conta, `valores` alinhados aos períodos.
+    """
+    try:
+        if cnpj:
+            cnpj_clean = "".join(filter(str.isdigit, cnpj))
+            if registro is not None:
+                operadora = registro.por_cnpj.get(cnpj_clean)
+                reg_ans = operadora["registro_operadora"] if operadora else None
+            else:
+                reg_ans = await db.scalar(
+                    select(Operadora.registro_operadora)
+                    .where(Operadora.cnpj == cnpj_clean)
+                    .limit(1)
+                )
+            if not reg_ans:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Operadora com CNPJ {cnpj} não encontrada",
+                )
+
+        parametros = (
+            reg_ans or "",
+            (uf or "").strip().upper(),
+            (modalidade or "").strip().lower(),
+            nivel or "",
+            ano_inicio or "",
+            ano_fim or "",
+        )
+        chave = chave_versionada("serie_despesas", versao, *parametros)
+
+        async def carregar():
+            result = await db.execute(
+                consulta_serie(reg_ans, uf, modalidade, nivel, ano_inicio, ano_fim)
+            )
+            periodos, series = montar_series(result.all())
+            total = [
+                sum(valores[i] or 0 for valores in series.values())
+                for i in range(len(periodos))
+            ]
+            resposta = SerieDespesasResponse(
+                nivel=nivel,
+                periodos=periodos,
+                total=total,
+                contas=(
+                    [SerieConta(conta=c, valores=v) for c, v in series.items()]
+                    if nivel
+                    else []
+                ),
+            )
+            return CorpoCodificado(codificar(resposta), settings.COMPRESSION_MIN_BYTES)
+
+        corpo = await cache.get_or_set(
+            chave, carregar, ttl_seconds=settings.DATASET_CACHE_TTL_SECONDS
+        )
+        return corpo.resposta(request)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao calcular série de despesas: {str(e)}",
+        )
+
+
 # ----------------------------
 # ROTA 4: GET /api/estatisticas
 # ----------------------------
 @app.get("/api/estatisticas", response_model=EstatisticaResponse)
 async def estatisticas_gerais(
-    db: Session = Depends(get_db), cache: SimpleCache = Depends(get_cache)
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    cache: Cache = Depends(get_cache),
+    versao: str = Depends(get_dataset_versao),
 ):
     """
     Retorna estatísticas agregadas
+
+    Servidas do snapshot gravado pelo import_data.py ao fim de cada carga
+    (uma leitura por chave primária); sem snapshot da versão atual, são
+    calculadas na hora.
     """
     try:
-        # Verificar cache (10 minutos)
-        cache_key = "estatisticas_gerais"
-        cached = cache.get(cache_key)
-        if cached:
-            return cached
-
-        # Calcular estatísticas
-        total_operadoras = db.query(Operadora).count()
-
-        # Top 5 operadoras por despesa
-        top_operadoras = (
-            db.query(DespesaAgregada)
+        async def carregar():
+            snapshot = (
+                await db.execute(
+                    select(EstatisticaSnapshot)
+                    .order_by(EstatisticaSnapshot.id.desc())
+                    .limit(1)
+                )
+            ).scalar_one_or_none()
+
+            if snapshot is not None and snapshot.versao == versao:
+                estatisticas = EstatisticaResponse.model_validate(
+                    {**snapshot.dados, "atualizado_em": snapshot.gerado_em}
+                )
+            else:
+                estatisticas = await calcular_estatisticas(db)
+
+            return CorpoCodificado(
+                codificar(estatisticas), settings.COMPRESSION_MIN_BYTES
+            )
+
+        # Cache por versão do dataset (corpo já codificado e comprimido)
+        corpo = await cache.get_or_set(
+            chave_versionada("estatisticas_gerais", versao),
+            carregar,
+            ttl_seconds=settings.DATASET_CACHE_TTL_SECONDS,
+        )
+        return corpo.resposta(request)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao calcular estatísticas: {str(e)}",
+        )
+
+
+async def calcular_estatisticas(db: AsyncSession) -> EstatisticaResponse:
+    """Consultas de /api/estatisticas (quando não há snapshot da carga atual)"""
+    # Calcular estatísticas
+    total_operadoras = await db.scalar(select(func.count()).select_from(Operadora))
+
+    # Top 5 operadoras por despesa
+    top_operadoras = (
+        await db.scalars(
+            select(DespesaAgregada)
             .order_by(DespesaAgregada.total_despesas.desc())
             .limit(5)
-            .all()
         )
+    ).all()
 
-        # Distribuição por UF
-        distribuicao_uf = (
-            db.query(
+    # Distribuição por UF
+    distribuicao_uf = (
+        await db.execute(
+            select(
                 DespesaAgregada.uf,
                 func.sum(DespesaAgregada.total_despesas).label("total"),
             )
             .group_by(DespesaAgregada.uf)
             .order_by(text("total DESC"))
-            .all()
         )
-
-        # Totais gerais
-        resultado = db.query(
-            func.sum(DespesaAgregada.total_despesas).label("total_despesas"),
-            func.avg(DespesaAgregada.total_despesas).label("media_despesas"),
-            func.count(distinct(DespesaAgregada.razao_social)).label(
-                "total_operadoras_ativas"
-            ),
-        ).first()
-
-        estatisticas = EstatisticaResponse(
-            total_despesas=resultado.total_despesas or 0,
-            media_despesas=resultado.media_despesas or 0,
-            total_operadoras=total_operadoras,
-            total_operadoras_ativas=resultado.total_operadoras_ativas or 0,
-            top_operadoras=top_operadoras,
-            distribuicao_uf=[
-                {"uf": item.uf, "total": item.total} for item in distribuicao_uf
-            ],
-            atualizado_em=datetime.now(),
+    ).all()
+
+    # Totais gerais
+    resultado = (
+        await db.execute(
+            select(
+                func.sum(DespesaAgregada.total_despesas).label("total_despesas"),
+                func.avg(DespesaAgregada.total_despesas).label("media_despesas"),
+                func.count(distinct(DespesaAgregada.reg_ans)).label(
+                    "total_operadoras_ativas"
+                ),
+            )
+        )
+    ).first()
+
+    # Cortes por modalidade e por trimestre
+    modalidade = func.coalesce(Operadora.modalidade, "Não informada").label("modalidade")
+    por_modalidade = (
+        await db.execute(
+            select(
+                modalidade,
+                func.count(distinct(Operadora.id)).label("operadoras"),
+                func.coalesce(func.sum(DespesaConsolidada.valor_despesas), 0).label(
+                    "total"
+                ),
+            )
+            .outerjoin(
+                DespesaConsolidada,
+                DespesaConsolidada.reg_ans == Operadora.registro_operadora,
+            )
+            .group_by(modalidade)
+            .order_by(text("total DESC"))
+        )
+    ).mappings().all()
+
+    por_trimestre = (
+        await db.execute(
+            select(
+                DespesaConsolidada.ano,
+                DespesaConsolidada.trimestre,
+                func.count(distinct(DespesaConsolidada.reg_ans)).label("operadoras"),
+                func.sum(DespesaConsolidada.valor_despesas).label("total"),
+            )
+            .group_by(DespesaConsolidada.ano, DespesaConsolidada.trimestre)
+            .order_by(DespesaConsolidada.ano, DespesaConsolidada.trimestre)
         )
+    ).mappings().all()
+
+    estatisticas = EstatisticaResponse(
+        total_despesas=resultado.total_despesas or 0,
+        media_despesas=resultado.media_despesas or 0,
+        total_operadoras=total_operadoras,
+        total_operadoras_ativas=resultado.total_operadoras_ativas or 0,
+        top_operadoras=top_operadoras,
+        distribuicao_uf=[
+            {"uf": item.uf, "total": item.total} for item in distribuicao_uf
+        ],
+        por_modalidade=[dict(item) for item in por_modalidade],
+        por_trimestre=[dict(item) for item in por_trimestre],
+        atualizado_em=datetime.now(),
+    )
 
-        # Armazenar em cache por 10 minutos
-        cache.set(cache_key, estatisticas, ttl_seconds=600)
+    return estatisticas
 
-        return estatisticas
+
+# ----------------------------
+# ROTA 4.1: GET /api/ranking
+# ----------------------------
+@app.get("/api/ranking", response_model=PaginatedResponse[RankingItemResponse])
+async def ranking_despesas(
+    metrica: Literal[METRICAS_RANKING] = Query(
+        "total_despesas", description="Métrica do ranking (ordem decrescente)"
+    ),
+    uf: Optional[str] = Query(None, description="Ranking dentro da UF"),
+    modalidade: Optional[str] = Query(None, description="Ranking dentro da modalidade (nome exato)"),
+    page: int = Query(1, ge=1, description="Número da página"),
+    limit: int = Query(10, ge=1, le=100, description="Itens por página"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Top-N de operadoras por `total_despesas`, `media_trimestral` ou
+    `coeficiente_variacao`, geral ou dentro de uma UF ou modalidade.
+
+    As posições são calculadas pelo import_data.py a cada carga; cada página
+    é uma faixa de posições no índice, com o mesmo custo em qualquer
+    profundidade.
+    """
+    try:
+        dimensao, particao = particao_ranking(uf, modalidade)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        total = await db.scalar(consulta_total(metrica, dimensao, particao)) or 0
+        offset = (page - 1) * limit
+        result = await db.execute(
+            consulta_pagina(metrica, dimensao, particao, offset, limit)
+        )
+
+        return PaginatedResponse(
+            data=[RankingItemResponse.model_validate(item) for item in result.scalars()],
+            total=total,
+            page=page,
+            limit=limit,
+            total_pages=(total + limit - 1) // limit,
+            has_next=offset + limit < total,
+            has_prev=page > 1,
+        )
 
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erro ao calcular estatísticas: {str(e)}",
+            detail=f"Erro ao consultar ranking: {str(e)}",
         )
 
 
 # ----------------------------
 # ROTA ADICIONAL: Busca
 # ----------------------------
-@app.get("/api/buscar")
+@app.get("/api/buscar", response_model=List[BuscaResponse])
 async def buscar_operadoras(
     q: str = Query(..., min_length=2, description="Termo de busca"),
-    db: Session = Depends(get_db),
+    limit: int = Query(20, ge=1, le=50, description="Máximo de resultados"),
+    fields: Optional[str] = Query(
+        None, description="Campos de cada resultado, separados por vírgula (ex.: cnpj,razao_social,relevancia)"
+    ),
+    db: AsyncSession = Depends(get_read_db),
+    registro: Optional[RegistroOperadoras] = Depends(get_registro),
 ):
     """
     Busca avançada em operadoras
+
+    Procura o termo (sem diferenciar acentos e maiúsculas) em razão social,
+    nome fantasia e cidade, e como prefixo de CNPJ. Cada palavra também casa
+    por prefixo, para uso em campos de busca enquanto o usuário digita.
+    Resultados ordenados por relevância. `fields` restringe os campos de
+    cada resultado.
     """
     try:
-        termo = f"%{q}%"
-
-        resultados = (
-            db.query(Operadora)
-            .filter(
-                db.or_(
-                    Operadora.razao_social.ilike(termo),
-                    Operadora.cnpj.ilike(termo),
-                    Operadora.nome_fantasia.ilike(termo),
-                    Operadora.cidade.ilike(termo),
-                )
-            )
-            .limit(20)
-            .all()
+        try:
+            campos = parse_fields(fields, CAMPOS_BUSCA)
+        except CamposInvalidos as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        if registro is not None:
+            resultados = [
+                {**operadora, "relevancia": relevancia}
+                for operadora, relevancia in registro.buscar(q, limit)
+            ]
+        else:
+            colunas = colunas_operadora(campos or CAMPOS_BUSCA)
+            result = await db.execute(consulta_busca(q, limit, colunas))
+            resultados = [dict(linha) for linha in result.mappings()]
+
+        if campos is None:
+            return [BuscaResponse.model_validate(item) for item in resultados]
+        return JSONBytesResponse(
+            codificar([recortar(item, campos) for item in resultados])
         )
 
-        return resultados
-
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -358,23 +1110,108 @@ async def buscar_operadoras(
         )
 
 
+# ----------------------------
+# Métricas (Prometheus)
+# ----------------------------
+ENGINES_METRICAS = engines_nomeados()
+for _nome, _engine in ENGINES_METRICAS.items():
+    instrumentar_engine(_engine.sync_engine, _nome)
+
+
+@registro_metricas.coletar("db_pool_size", "Tamanho configurado do pool")
+def _pool_tamanho():
+    return [({"engine": n}, e.pool.size()) for n, e in ENGINES_METRICAS.items()]
+
+
+@registro_metricas.coletar("db_pool_checked_out", "Conexões do pool em uso")
+def _pool_em_uso():
+    return [({"engine": n}, e.pool.checkedout()) for n, e in ENGINES_METRICAS.items()]
+
+
+@registro_metricas.coletar("db_pool_overflow", "Conexões além do pool (overflow)")
+def _pool_overflow():
+    # overflow() é negativo enquanto o pool não está cheio
+    return [
+        ({"engine": n}, max(e.pool.overflow(), 0)) for n, e in ENGINES_METRICAS.items()
+    ]
+
+
+def _coletor_cache(chave: str):
+    def coletar():
+        cache = getattr(app.state, "cache", None)
+        stats = cache.stats() if cache else {}
+        if chave not in stats:
+            return []
+        return [({"backend": stats["backend"]}, stats[chave])]
+
+    return coletar
+
+
+for _chave, _tipo, _ajuda in (
+    ("hits", "counter", "Leituras do cache encontradas"),
+    ("misses", "counter", "Leituras do cache não encontradas"),
+    ("evictions", "counter", "Entradas removidas por limite de tamanho"),
+    ("expirations", "counter", "Entradas removidas por TTL"),
+    ("entries", "gauge", "Entradas no cache"),
+    ("bytes", "gauge", "Bytes ocupados pelo cache"),
+):
+    _nome = f"cache_{_chave}_total" if _tipo == "counter" else f"cache_{_chave}"
+    registro_metricas.coletar(_nome, _ajuda, _tipo)(_coletor_cache(_chave))
+
+
+def _coletor_admissao(chave: str):
+    def coletar():
+        return [
+            ({"classe": classe}, estado[chave])
+            for classe, estado in admissao.estado().items()
+        ]
+
+    return coletar
+
+
+registro_metricas.coletar(
+    "admission_in_flight", "Requisições em execução por classe de rota"
+)(_coletor_admissao("em_execucao"))
+registro_metricas.coletar(
+    "admission_queued", "Requisições na fila por classe de rota"
+)(_coletor_admissao("na_fila"))
+registro_metricas.coletar(
+    "admission_rejected_total", "Requisições recusadas (429/503)", "counter"
+)(_coletor_admissao("recusadas"))
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metricas():
+    """Métricas no formato texto do Prometheus"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return PlainTextResponse(
+        registro_metricas.exportar(), media_type=METRICAS_CONTENT_TYPE
+    )
+
+
 # ----------------------------
 # Health check
 # ----------------------------
 @app.get("/health")
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(
+    db: AsyncSession = Depends(get_db), cache: Cache = Depends(get_cache)
+):
     """
     Health check da API e banco de dados
     """
     try:
         # Testar conexão com banco
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
 
         return {
             "status": "healthy",
             "timestamp": datetime.now().isoformat(),
             "service": "ans-analytics-api",
             "database": "connected",
+            "replicas": estado_replicas(),
+            "admissao": admissao.estado(),
+            "cache": cache.stats(),
         }
     except Exception as e:
         raise HTTPException(
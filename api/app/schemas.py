@@ -24,6 +24,9 @@ class OperadoraResponse(OperadoraBase):
     
     model_config = {"from_attributes": True}
 
+class BuscaResponse(OperadoraResponse):
+    relevancia: float = 0.0
+
 class OperadoraDetailResponse(OperadoraResponse):
     logradouro: Optional[str] = None
     numero: Optional[str] = None
@@ -63,6 +66,17 @@ class DistribuicaoUF(BaseModel):
     uf: str
     total: Decimal
 
+class EstatisticaModalidade(BaseModel):
+    modalidade: str
+    operadoras: int
+    total: Decimal
+
+class EstatisticaTrimestre(BaseModel):
+    ano: int
+    trimestre: int
+    operadoras: int
+    total: Decimal
+
 class EstatisticaResponse(BaseModel):
     total_despesas: Decimal
     media_despesas: Decimal
@@ -70,14 +84,57 @@ class EstatisticaResponse(BaseModel):
     total_operadoras_ativas: int
     top_operadoras: List[DespesaAgregadaResponse]
     distribuicao_uf: List[DistribuicaoUF]
+    por_modalidade: List[EstatisticaModalidade] = []
+    por_trimestre: List[EstatisticaTrimestre] = []
     atualizado_em: datetime
 
+# Schemas para séries de despesas
+class SerieConta(BaseModel):
+    conta: str
+    valores: List[Optional[Decimal]]
+
+class SerieDespesasResponse(BaseModel):
+    nivel: Optional[int] = None
+    periodos: List[str]
+    total: List[Decimal]
+    contas: List[SerieConta]
+
+# Schema para rankings
+class RankingItemResponse(BaseModel):
+    posicao: int
+    razao_social: str
+    uf: str
+    modalidade: Optional[str] = None
+    total_despesas: Decimal
+    media_trimestral: Decimal
+    coeficiente_variacao: Optional[Decimal] = None
+
+    model_config = {"from_attributes": True}
+
+# Schemas para consultas em lote
+class LoteRequest(BaseModel):
+    cnpjs: List[str] = Field(default_factory=list, description="CNPJs (com ou sem formatação)")
+    registros_ans: List[str] = Field(default_factory=list, description="Registros ANS")
+    incluir_despesas: bool = False
+    ano: Optional[int] = None
+    trimestre: Optional[int] = Field(None, ge=1, le=4)
+
+class OperadoraLoteResponse(OperadoraDetailResponse):
+    despesas: Optional[List[DespesaResponse]] = None
+
+class LoteResponse(BaseModel):
+    operadoras: List[OperadoraLoteResponse]
+    nao_encontrados: List[str]
+
 # Schema para paginação
 class PaginatedResponse(BaseModel, Generic[T]):
     data: List[T]
     total: int
+    total_estimado: bool = False
     page: int
     limit: int
     total_pages: int
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
@@ -0,0 +1,121 @@
+"""
+Compara dois resultados de benchmark
+
+    python -m bench.compare main HEAD --tolerancia 10
+
+BASE e NOVO podem ser arquivos JSON ou referências git (commit, branch,
+tag); referências são resolvidas para `bench/resultados/<hash curto>.json`.
+Sai com código 1 se algum cenário piorar além da tolerância (p95/p99 mais
+altos, vazão mais baixa ou erros novos).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import List, Optional
+
+from bench.run import BENCH_DIR, RESULTADOS_DIR, VERSAO_FORMATO
+
+# Métricas comparadas: (chave, maior é melhor)
+METRICAS = (
+    ("p50_ms", False),
+    ("p95_ms", False),
+    ("p99_ms", False),
+    ("rps", True),
+)
+# Métricas que contam como regressão (p50 é só informativo)
+METRICAS_REGRESSAO = ("p95_ms", "p99_ms", "rps")
+
+
+def carregar(referencia: str) -> dict:
+    """Arquivo de resultado, ou o resultado salvo para a referência git"""
+    caminho = referencia
+    if not os.path.isfile(caminho):
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", referencia],
+                cwd=BENCH_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            sys.exit(f"❌ Nem arquivo nem referência git: {referencia}")
+        caminho = os.path.join(RESULTADOS_DIR, f"{commit}.json")
+        if not os.path.isfile(caminho):
+            sys.exit(
+                f"❌ Sem resultado para {referencia} ({commit}). "
+                f"Rode `python -m bench.run` nesse commit primeiro."
+            )
+
+    with open(caminho, encoding="utf-8") as f:
+        resultado = json.load(f)
+    if resultado.get("versao_formato") != VERSAO_FORMATO:
+        sys.exit(f"❌ Formato de resultado incompatível: {caminho}")
+    return resultado
+
+
+def variacao(base: float, novo: float) -> Optional[float]:
+    """Variação percentual de `base` para `novo` (None se base for zero)"""
+    if not base:
+        return None
+    return (novo - base) / base * 100
+
+
+def comparar(base: dict, novo: dict, tolerancia: float) -> List[str]:
+    """Imprime a tabela comparativa e devolve as regressões encontradas"""
+    regressoes: List[str] = []
+
+    if base["parametros"] != novo["parametros"]:
+        print("⚠️  Parâmetros diferentes entre as execuções; a comparação pode não ser justa")
+
+    print(f"{'cenário':<26}" + "".join(f"{chave:>24}" for chave, _ in METRICAS))
+    for nome, atual in novo["cenarios"].items():
+        anterior = base["cenarios"].get(nome)
+        if anterior is None:
+            print(f"{nome:<26}  (novo cenário)")
+            continue
+
+        colunas = []
+        for chave, maior_melhor in METRICAS:
+            delta = variacao(anterior[chave], atual[chave])
+            piorou = delta is not None and (-delta if maior_melhor else delta) > tolerancia
+            marcador = "❌" if piorou and chave in METRICAS_REGRESSAO else "  "
+            texto_delta = f"{delta:+.1f}%" if delta is not None else "  n/a"
+            colunas.append(f"{anterior[chave]:>8.1f} → {atual[chave]:>8.1f} {texto_delta:>7}{marcador}")
+            if piorou and chave in METRICAS_REGRESSAO:
+                regressoes.append(f"{nome}: {chave} {anterior[chave]} → {atual[chave]} ({texto_delta})")
+
+        if atual["erros"] > anterior["erros"]:
+            regressoes.append(f"{nome}: erros {anterior['erros']} → {atual['erros']}")
+        print(f"{nome:<26}" + "".join(f"{coluna:>24}" for coluna in colunas))
+
+    return regressoes
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compara dois resultados de benchmark")
+    parser.add_argument("base", help="Arquivo ou referência git do resultado de referência")
+    parser.add_argument("novo", help="Arquivo ou referência git do resultado a avaliar")
+    parser.add_argument(
+        "--tolerancia", type=float, default=10.0,
+        help="Piora percentual aceita antes de acusar regressão",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    base, novo = carregar(args.base), carregar(args.novo)
+    print(f"📊 {base['commit']} ({base['data']}) → {novo['commit']} ({novo['data']})\n")
+
+    regressoes = comparar(base, novo, args.tolerancia)
+    if regressoes:
+        print(f"\n❌ Regressões acima de {args.tolerancia:.0f}%:")
+        for regressao in regressoes:
+            print(f"   {regressao}")
+        sys.exit(1)
+    print(f"\n✅ Nenhuma regressão acima de {args.tolerancia:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
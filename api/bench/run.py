@@ -0,0 +1,238 @@
+"""
+Executa os cenários de carga contra uma API em execução
+
+    python -m bench.run --base-url http://localhost:8000 --concorrencia 16
+
+Cada cenário dispara `--requisicoes` requisições com `--concorrencia`
+clientes simultâneos (após `--aquecimento` requisições descartadas) e mede
+vazão e latência (p50/p95/p99). Os parâmetros das rotas (CNPJs, UFs,
+modalidades, termos de busca) vêm da própria API e são sorteados com
+`--semente`, então duas execuções fazem as mesmas requisições.
+
+O resultado vai para `bench/resultados/<commit>.json`, que
+`python -m bench.compare` compara entre commits.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import statistics
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTADOS_DIR = os.path.join(BENCH_DIR, "resultados")
+
+# Versão do formato do arquivo de resultados
+VERSAO_FORMATO = 1
+
+
+class Amostras:
+    """Valores reais da base usados para montar as requisições"""
+
+    def __init__(self, cnpjs: List[str], ufs: List[str], modalidades: List[str],
+                 termos: List[str], total_paginas: int):
+        self.cnpjs = cnpjs
+        self.ufs = ufs
+        self.modalidades = modalidades
+        self.termos = termos
+        self.total_paginas = total_paginas
+
+
+async def coletar_amostras(cliente: httpx.AsyncClient, limite: int = 100) -> Amostras:
+    """Lê algumas páginas da listagem para sortear parâmetros realistas"""
+    resposta = await cliente.get("/api/operadoras", params={"limit": limite})
+    resposta.raise_for_status()
+    primeira = resposta.json()
+    operadoras = list(primeira["data"])
+    for pagina in range(2, min(primeira["total_pages"], 5) + 1):
+        resposta = await cliente.get("/api/operadoras", params={"limit": limite, "page": pagina})
+        resposta.raise_for_status()
+        operadoras.extend(resposta.json()["data"])
+
+    # Primeira palavra da razão social (e um prefixo dela, como na digitação)
+    palavras = sorted({o["razao_social"].split()[0] for o in operadoras})
+    termos = palavras + [p[:3] for p in palavras if len(p) > 3]
+
+    return Amostras(
+        cnpjs=sorted({o["cnpj"] for o in operadoras}),
+        ufs=sorted({o["uf"] for o in operadoras}),
+        modalidades=sorted({o["modalidade"] for o in operadoras if o.get("modalidade")}),
+        termos=termos,
+        # páginas de 20 itens, como nos cenários de listagem
+        total_paginas=math.ceil(primeira["total"] / 20),
+    )
+
+
+# Cenário: nome -> função (amostras, rng) -> (caminho, parâmetros)
+CENARIOS: Dict[str, Callable] = {
+    "listagem": lambda a, rng: ("/api/operadoras", {"page": 1, "limit": 20}),
+    "listagem_filtros": lambda a, rng: (
+        "/api/operadoras",
+        {"uf": rng.choice(a.ufs), "modalidade": rng.choice(a.modalidades).split()[0], "limit": 20},
+    ),
+    "listagem_pagina_profunda": lambda a, rng: (
+        "/api/operadoras",
+        {"page": rng.randint(max(a.total_paginas // 2, 1), max(a.total_paginas, 1)), "limit": 20},
+    ),
+    "detalhe": lambda a, rng: (f"/api/operadoras/{rng.choice(a.cnpjs)}", {}),
+    "despesas": lambda a, rng: (f"/api/operadoras/{rng.choice(a.cnpjs)}/despesas", {}),
+    "estatisticas": lambda a, rng: ("/api/estatisticas", {}),
+    "buscar": lambda a, rng: ("/api/buscar", {"q": rng.choice(a.termos), "limit": 20}),
+    "ranking": lambda a, rng: (
+        "/api/ranking",
+        {
+            "metrica": rng.choice(["total_despesas", "media_trimestral", "coeficiente_variacao"]),
+            "uf": rng.choice(a.ufs),
+            "page": rng.randint(1, 10),
+            "limit": 20,
+        },
+    ),
+}
+
+
+def percentil(ordenadas: List[float], p: float) -> float:
+    """Percentil por posição mais próxima (lista já ordenada)"""
+    if not ordenadas:
+        return 0.0
+    posicao = math.ceil(p / 100 * len(ordenadas))
+    return ordenadas[min(max(posicao, 1), len(ordenadas)) - 1]
+
+
+async def executar_cenario(
+    cliente: httpx.AsyncClient,
+    gerar: Callable,
+    amostras: Amostras,
+    requisicoes: int,
+    concorrencia: int,
+    semente: int,
+) -> dict:
+    rng = random.Random(semente)
+    pedidos = [gerar(amostras, rng) for _ in range(requisicoes)]
+    latencias: List[float] = []
+    status: Counter = Counter()
+    fila = iter(pedidos)
+
+    async def trabalhador():
+        for caminho, params in fila:
+            inicio = time.perf_counter()
+            try:
+                resposta = await cliente.get(caminho, params=params)
+                await resposta.aread()
+                codigo = str(resposta.status_code)
+            except httpx.HTTPError as e:
+                codigo = type(e).__name__
+            latencias.append(time.perf_counter() - inicio)
+            status[codigo] += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+
+    ordenadas = sorted(latencias)
+    erros = sum(n for codigo, n in status.items() if not codigo.startswith(("2", "3")))
+    return {
+        "requisicoes": len(latencias),
+        "erros": erros,
+        "status": dict(status),
+        "duracao_s": round(duracao, 3),
+        "rps": round(len(latencias) / duracao, 1) if duracao else 0.0,
+        "media_ms": round(statistics.fmean(ordenadas) * 1000, 2) if ordenadas else 0.0,
+        "p50_ms": round(percentil(ordenadas, 50) * 1000, 2),
+        "p95_ms": round(percentil(ordenadas, 95) * 1000, 2),
+        "p99_ms": round(percentil(ordenadas, 99) * 1000, 2),
+        "max_ms": round(ordenadas[-1] * 1000, 2) if ordenadas else 0.0,
+    }
+
+
+def commit_atual() -> str:
+    """Hash curto do HEAD (com sufixo -dirty se houver alterações), ou 'local'"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        sujo = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=BENCH_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        return f"{commit}-dirty" if sujo else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "local"
+
+
+async def executar(args) -> dict:
+    nomes = args.cenarios.split(",") if args.cenarios else list(CENARIOS)
+    desconhecidos = [nome for nome in nomes if nome not in CENARIOS]
+    if desconhecidos:
+        raise SystemExit(f"❌ Cenários desconhecidos: {', '.join(desconhecidos)}")
+
+    limites = httpx.Limits(max_connections=args.concorrencia, max_keepalive_connections=args.concorrencia)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limites) as cliente:
+        amostras = await coletar_amostras(cliente)
+        print(f"🎯 {len(amostras.cnpjs)} CNPJs, {len(amostras.ufs)} UFs, {amostras.total_paginas} páginas")
+
+        cenarios = {}
+        for i, nome in enumerate(nomes):
+            if args.aquecimento:
+                await executar_cenario(
+                    cliente, CENARIOS[nome], amostras, args.aquecimento, args.concorrencia, args.semente + i
+                )
+            resultado = await executar_cenario(
+                cliente, CENARIOS[nome], amostras, args.requisicoes, args.concorrencia, args.semente + i
+            )
+            cenarios[nome] = resultado
+            print(
+                f"   {nome:<26} {resultado['rps']:>8.1f} req/s  "
+                f"p50 {resultado['p50_ms']:>7.1f} ms  p95 {resultado['p95_ms']:>7.1f} ms  "
+                f"p99 {resultado['p99_ms']:>7.1f} ms  erros {resultado['erros']}"
+            )
+
+    return {
+        "versao_formato": VERSAO_FORMATO,
+        "commit": commit_atual(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "parametros": {
+            "base_url": args.base_url,
+            "concorrencia": args.concorrencia,
+            "requisicoes": args.requisicoes,
+            "aquecimento": args.aquecimento,
+            "semente": args.semente,
+        },
+        "cenarios": cenarios,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de latência das rotas da API")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="URL da API em execução")
+    parser.add_argument("--concorrencia", type=int, default=8, help="Clientes simultâneos")
+    parser.add_argument("--requisicoes", type=int, default=500, help="Requisições medidas por cenário")
+    parser.add_argument("--aquecimento", type=int, default=50, help="Requisições descartadas por cenário")
+    parser.add_argument("--cenarios", default="", help=f"Lista separada por vírgula ({', '.join(CENARIOS)})")
+    parser.add_argument("--semente", type=int, default=42, help="Semente do sorteio de parâmetros")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout por requisição (s)")
+    parser.add_argument("--saida", default="", help="Arquivo de resultado (padrão: bench/resultados/<commit>.json)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    resultado = asyncio.run(executar(args))
+
+    saida = args.saida or os.path.join(RESULTADOS_DIR, f"{resultado['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f"💾 Resultado salvo em {saida}")
+
+
+if __name__ == "__main__":
+    main()
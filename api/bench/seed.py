@@ -0,0 +1,235 @@
+"""
+Cria e popula um banco sintético para os benchmarks
+
+    python -m bench.seed --operadoras 2000 --contas 20 --recriar
+
+O esquema vem de `scripts/script.sql` (extensões, tabelas, índices, views e
+funções) e os dados são gerados no próprio PostgreSQL com `generate_series`
+e `setseed`: a mesma semente e escala produzem o mesmo banco, sem rede nem
+arquivos CSV. Ao final grava checkpoints (versão do dataset), os rankings e o
+snapshot de estatísticas, como uma importação real.
+"""
+import argparse
+import os
+import sys
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(BASE_DIR, "scripts")
+
+# Trecho de script.sql aplicado ao banco de benchmark (sem o DROP/CREATE
+# DATABASE e sem os \echo finais do psql)
+INICIO_ESQUEMA = "-- 2. CRIAR EXTENSÕES"
+FIM_ESQUEMA = "-- 6. VERIFICAÇÃO FINAL"
+
+SEED_SQL = {
+    "cadastro_operadoras": """
+        INSERT INTO cadastro_operadoras (
+            registro_operadora, cnpj, razao_social, nome_fantasia, modalidade,
+            logradouro, numero, bairro, cidade, uf, cep, ddd, telefone,
+            endereco_eletronico, representante, cargo_representante,
+            regiao_de_comercializacao, data_registro_ans
+        )
+        SELECT
+            (300000 + i)::text,
+            -- 7919 é primo com 10^8: raízes de CNPJ distintas
+            lpad((i::bigint * 7919 % 100000000)::text, 8, '0') || '0001'
+                || lpad((i % 100)::text, 2, '0'),
+            (ARRAY['UNIMED', 'AMIL', 'BRADESCO', 'SULAMERICA', 'HAPVIDA',
+                   'NOTRE DAME', 'PORTO', 'ODONTOPREV', 'SAO FRANCISCO', 'PREVENT'])[1 + i % 10]
+                || ' ' || (ARRAY['SAUDE', 'ASSISTENCIA MEDICA', 'ODONTO', 'PLANOS DE SAUDE',
+                                 'COOPERATIVA MEDICA', 'SEGUROS'])[1 + (i / 10) % 6]
+                || ' ' || i || ' LTDA',
+            (ARRAY['UNIMED', 'AMIL', 'BRADESCO', 'SULAMERICA', 'HAPVIDA',
+                   'NOTRE DAME', 'PORTO', 'ODONTOPREV', 'SAO FRANCISCO', 'PREVENT'])[1 + i % 10]
+                || ' ' || i,
+            (ARRAY['Cooperativa Médica', 'Medicina de Grupo', 'Odontologia de Grupo',
+                   'Seguradora Especializada em Saúde', 'Autogestão', 'Filantropia',
+                   'Cooperativa Odontológica'])[1 + i % 7],
+            'RUA ' || (i % 300),
+            (i % 2000)::text,
+            'BAIRRO ' || (i % 40),
+            'CIDADE ' || (i % 97),
+            -- distribuição concentrada nas primeiras UFs, como no cadastro real
+            (ARRAY['SP', 'MG', 'RJ', 'PR', 'RS', 'SC', 'BA', 'GO', 'PE', 'CE',
+                   'ES', 'DF', 'MT', 'MS', 'PA', 'PB', 'RN', 'AL', 'MA', 'PI',
+                   'SE', 'AM', 'TO', 'RO', 'AC', 'AP', 'RR'])[1 + floor(27 * power(random(), 3))::int],
+            lpad((i * 131 % 100000000)::text, 8, '0'),
+            lpad((11 + i % 89)::text, 2, '0'),
+            lpad((i * 37 % 100000000)::text, 8, '0'),
+            'contato' || i || '@operadora.com.br',
+            'REPRESENTANTE ' || i,
+            'DIRETOR',
+            1 + i % 6,
+            DATE '1995-01-01' + (i * 37 % 10000)
+        FROM generate_series(1, :operadoras) AS i
+    """,
+    "despesas_consolidadas": """
+        INSERT INTO despesas_consolidadas
+            (reg_ans, cd_conta_contabil, ano, trimestre, valor_despesas)
+        SELECT
+            o.registro_operadora,
+            c.conta,
+            a.ano,
+            t.trimestre,
+            round((o.escala * (0.5 + random()))::numeric, 2)
+        FROM (
+            -- porte da operadora com cauda longa (poucas muito grandes)
+            SELECT id, registro_operadora, exp(random() * 8) * 1000 AS escala
+            FROM cadastro_operadoras
+            ORDER BY id
+        ) o
+        CROSS JOIN (
+            SELECT '4' || (1 + k % 9)::text || lpad(k::text, 4, '0') AS conta
+            FROM generate_series(1, :contas) AS k
+        ) c
+        CROSS JOIN generate_series(:ano_inicio, :ano_fim) AS a(ano)
+        CROSS JOIN generate_series(1, 4) AS t(trimestre)
+        ORDER BY o.id, c.conta, a.ano, t.trimestre
+    """,
+    "despesas_agregadas": """
+        INSERT INTO despesas_agregadas (
+            reg_ans, razao_social, uf, total_despesas, media_trimestral,
+            desvio_padrao, coeficiente_variacao
+        )
+        SELECT
+            co.registro_operadora,
+            co.razao_social,
+            co.uf,
+            round(SUM(t.total)::numeric, 2),
+            round(AVG(t.total)::numeric, 2),
+            round(COALESCE(STDDEV_SAMP(t.total), 0)::numeric, 2),
+            round((COALESCE(STDDEV_SAMP(t.total), 0) / NULLIF(AVG(t.total), 0) * 100)::numeric, 2)
+        FROM (
+            SELECT reg_ans, ano, trimestre, SUM(valor_despesas) AS total
+            FROM despesas_consolidadas
+            GROUP BY reg_ans, ano, trimestre
+        ) t
+        JOIN cadastro_operadoras co ON co.registro_operadora = t.reg_ans
+        GROUP BY co.registro_operadora, co.razao_social, co.uf
+        ORDER BY co.razao_social, co.registro_operadora
+    """,
+}
+
+
+def url_padrao() -> str:
+    """DATABASE_URL da API apontando para o banco `<nome>_bench`"""
+    url = make_url(settings.DATABASE_URL)
+    return url.set(database=f"{url.database}_bench").render_as_string(hide_password=False)
+
+
+def criar_banco(url: str, recriar: bool) -> None:
+    """Cria o banco de benchmark (pelo banco de manutenção `postgres`)"""
+    alvo = make_url(url)
+    manutencao = create_engine(alvo.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    with manutencao.connect() as conn:
+        existe = conn.execute(
+            text("SELECT 1 FROM pg_database WHERE datname = :nome"), {"nome": alvo.database}
+        ).scalar()
+        if existe and not recriar:
+            sys.exit(
+                f"❌ O banco {alvo.database} já existe. Use --recriar para apagá-lo "
+                "e gerar os dados de novo."
+            )
+        if existe:
+            conn.execute(text(f'DROP DATABASE "{alvo.database}" WITH (FORCE)'))
+        conn.execute(text(f'CREATE DATABASE "{alvo.database}" ENCODING \'UTF8\' TEMPLATE template0'))
+    manutencao.dispose()
+
+
+def aplicar_esquema(engine) -> None:
+    """Executa o trecho de esquema de scripts/script.sql"""
+    with open(os.path.join(SCRIPTS_DIR, "script.sql"), encoding="utf-8") as f:
+        script = f.read()
+    esquema = script[script.index(INICIO_ESQUEMA):script.index(FIM_ESQUEMA)]
+
+    # Várias instruções (e funções com $$) de uma vez: direto pelo driver
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(esquema)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def popular(engine, args) -> None:
+    parametros = {
+        "operadoras": args.operadoras,
+        "contas": args.contas,
+        "ano_inicio": args.ano_fim - args.anos + 1,
+        "ano_fim": args.ano_fim,
+    }
+    with engine.begin() as conn:
+        # setseed vale para a sessão: todos os random() abaixo são reprodutíveis
+        conn.execute(text("SELECT setseed(:semente)"), {"semente": args.semente})
+        for tabela, sql in SEED_SQL.items():
+            inicio = time.perf_counter()
+            linhas = conn.execute(text(sql), parametros).rowcount
+            print(f"   {tabela}: {linhas:,} linhas ({time.perf_counter() - inicio:.1f}s)")
+
+        # Checkpoints concluídos: definem a versão do dataset vista pela API
+        conn.execute(
+            text(
+                "INSERT INTO import_checkpoints (arquivo, assinatura, linhas_processadas, "
+                "linhas_importadas, status, atualizado_em) "
+                "SELECT arquivo, :assinatura, 0, 0, 'concluido', CURRENT_TIMESTAMP "
+                "FROM unnest(CAST(:arquivos AS TEXT[])) AS arquivo"
+            ),
+            {
+                "assinatura": f"bench-{args.semente}",
+                "arquivos": [
+                    "Relatorio_cadop.csv",
+                    "consolidado_despesas.csv",
+                    "despesas_agregadas.csv",
+                ],
+            },
+        )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Gera o banco sintético dos benchmarks")
+    parser.add_argument("--database-url", default=url_padrao(), help="Banco a criar (padrão: <DATABASE_URL>_bench)")
+    parser.add_argument("--operadoras", type=int, default=2000, help="Operadoras no cadastro")
+    parser.add_argument("--contas", type=int, default=20, help="Contas contábeis por operadora")
+    parser.add_argument("--anos", type=int, default=3, help="Anos de despesas (4 trimestres cada)")
+    parser.add_argument("--ano-fim", type=int, default=2025, help="Último ano das despesas")
+    parser.add_argument("--semente", type=float, default=0.42, help="Semente do setseed (-1 a 1)")
+    parser.add_argument("--recriar", action="store_true", help="Apaga o banco se já existir")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    url = make_url(args.database_url)
+    print(f"🧪 Banco de benchmark: {url.database}")
+
+    criar_banco(args.database_url, args.recriar)
+    engine = create_engine(args.database_url)
+    aplicar_esquema(engine)
+    print("📐 Esquema aplicado (scripts/script.sql)")
+
+    popular(engine, args)
+
+    # Vínculo com o cadastro, rankings e snapshot de estatísticas, como no
+    # fim de uma importação
+    sys.path.insert(0, SCRIPTS_DIR)
+    from import_data import gerar_estatisticas, gerar_ranking, vincular_operadoras
+
+    vincular_operadoras(engine)
+    gerar_ranking(engine)
+    gerar_estatisticas(engine)
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE"))
+    engine.dispose()
+    print("✅ Banco de benchmark pronto")
+
+
+if __name__ == "__main__":
+    main()
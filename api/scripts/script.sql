@@ -11,6 +11,27 @@ CREATE DATABASE ans_analytics
 
 -- 2. CRIAR EXTENSÕES
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS pg_trgm;   -- busca por trigramas
+CREATE EXTENSION IF NOT EXISTS unaccent;  -- busca sem acentos
+
+-- Funções IMMUTABLE para os índices de busca (unaccent() é apenas STABLE)
+CREATE OR REPLACE FUNCTION f_unaccent(texto TEXT)
+RETURNS TEXT AS $$
+    SELECT public.unaccent('public.unaccent'::regdictionary, texto)
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+
+CREATE OR REPLACE FUNCTION busca_normalizar(texto TEXT)
+RETURNS TEXT AS $$
+    SELECT lower(public.f_unaccent(coalesce(texto, '')))
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- Documento de busca das operadoras (usado por /api/buscar)
+CREATE OR REPLACE FUNCTION busca_documento(razao_social TEXT, nome_fantasia TEXT, cidade TEXT)
+RETURNS TEXT AS $$
+    SELECT public.busca_normalizar(razao_social) || ' ' ||
+           public.busca_normalizar(nome_fantasia) || ' ' ||
+           public.busca_normalizar(cidade)
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
 
 -- 3. CRIAR TABELAS
 
@@ -44,6 +65,14 @@ CREATE TABLE cadastro_operadoras (
 CREATE INDEX idx_cadastro_uf ON cadastro_operadoras(uf);
 CREATE INDEX idx_cadastro_razao_social ON cadastro_operadoras(razao_social);
 CREATE INDEX idx_cadastro_modalidade ON cadastro_operadoras(modalidade);
+CREATE INDEX idx_cadastro_razao_social_id ON cadastro_operadoras(razao_social, id); -- paginação keyset
+
+-- Índices de busca (/api/buscar): substring/similaridade, full-text com prefixo e CNPJ por prefixo
+CREATE INDEX idx_cadastro_busca_trgm ON cadastro_operadoras
+    USING gin (busca_documento(razao_social, nome_fantasia, cidade) gin_trgm_ops);
+CREATE INDEX idx_cadastro_busca_fts ON cadastro_operadoras
+    USING gin (to_tsvector('simple'::regconfig, busca_documento(razao_social, nome_fantasia, cidade)));
+CREATE INDEX idx_cadastro_cnpj_prefixo ON cadastro_operadoras(cnpj varchar_pattern_ops);
 
 -- Restrições
 ALTER TABLE cadastro_operadoras 
@@ -86,6 +115,8 @@ CREATE INDEX idx_dc_valor ON despesas_consolidadas(valor_despesas);
 -- TABELA 3: Despesas agregadas
 CREATE TABLE despesas_agregadas (
     id SERIAL PRIMARY KEY,
+    reg_ans VARCHAR(20),
+    operadora_id INTEGER, -- cadastro_operadoras.id, preenchido pelo import
     razao_social VARCHAR(255) NOT NULL,
     uf CHAR(2) NOT NULL,
     total_despesas FLOAT NOT NULL,
@@ -101,10 +132,70 @@ ADD CONSTRAINT check_uf_agregada CHECK (uf ~ '^[A-Z]{2}$');
 
 -- Índices para despesas_agregadas
 CREATE INDEX idx_da_razao_social ON despesas_agregadas(razao_social);
+CREATE INDEX idx_da_reg_ans ON despesas_agregadas(reg_ans);
+CREATE INDEX idx_da_operadora_id ON despesas_agregadas(operadora_id);
 CREATE INDEX idx_da_uf ON despesas_agregadas(uf);
 CREATE INDEX idx_da_total ON despesas_agregadas(total_despesas DESC);
 CREATE INDEX idx_da_cv ON despesas_agregadas(coeficiente_variacao DESC);
 
+-- TABELA 4: Checkpoints da importação (um por arquivo CSV)
+CREATE TABLE import_checkpoints (
+    arquivo VARCHAR(100) PRIMARY KEY,
+    assinatura VARCHAR(64) NOT NULL,
+    linhas_processadas INTEGER NOT NULL DEFAULT 0,
+    linhas_importadas INTEGER NOT NULL DEFAULT 0,
+    linhas_rejeitadas INTEGER NOT NULL DEFAULT 0,
+    hash_processado VARCHAR(16) NOT NULL DEFAULT '0000000000000000',
+    status VARCHAR(20) NOT NULL DEFAULT 'em_andamento',
+    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- TABELA 5: Quarentena de linhas rejeitadas na importação
+CREATE TABLE import_quarentena (
+    id SERIAL PRIMARY KEY,
+    arquivo VARCHAR(100) NOT NULL,
+    linha INTEGER NOT NULL,
+    motivo TEXT NOT NULL,
+    dados JSONB,
+    data_carga TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_quarentena_arquivo ON import_quarentena(arquivo);
+
+-- TABELA 6: Snapshot das estatísticas gerais (gerado pelo import a cada carga)
+CREATE TABLE estatisticas_snapshot (
+    id SERIAL PRIMARY KEY,
+    versao VARCHAR(64) NOT NULL,
+    dados JSONB NOT NULL,
+    gerado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- TABELA 7: Rankings de despesas (gerados pelo import a cada carga)
+-- Uma linha por operadora, métrica e partição (geral, UF ou modalidade),
+-- com a posição já calculada: qualquer página do ranking é uma faixa da PK
+CREATE TABLE ranking_despesas (
+    metrica VARCHAR(30) NOT NULL,
+    dimensao VARCHAR(20) NOT NULL,
+    particao VARCHAR(100) NOT NULL,
+    posicao INTEGER NOT NULL,
+    despesa_agregada_id INTEGER NOT NULL,
+    razao_social VARCHAR(255) NOT NULL,
+    uf CHAR(2) NOT NULL,
+    modalidade VARCHAR(100),
+    total_despesas NUMERIC(15,2) NOT NULL,
+    media_trimestral NUMERIC(15,2) NOT NULL,
+    coeficiente_variacao DECIMAL(10,2),
+    PRIMARY KEY (metrica, dimensao, particao, posicao)
+);
+
+-- TABELA 8: Versão do dataset (linha única, publicada pelo import ao fim de
+-- cada carga; a API inclui a versão nas chaves de cache)
+CREATE TABLE dataset_versao (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    versao VARCHAR(64) NOT NULL,
+    publicado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- =======================================================
 -- IMPORTANTE: NÃO IMPORTAR DADOS AQUI!
 -- A importação será feita pelo Python depois
@@ -121,7 +212,7 @@ SELECT
     da.coeficiente_variacao
 FROM cadastro_operadoras co
 LEFT JOIN despesas_agregadas da 
-    ON co.razao_social = da.razao_social AND co.uf = da.uf;
+    ON da.operadora_id = co.id;
 
 -- View: Análise por UF
 CREATE OR REPLACE VIEW vw_analise_por_uf AS
@@ -135,7 +226,7 @@ WHERE uf IS NOT NULL AND uf != ''
 GROUP BY uf
 ORDER BY total_despesas_uf DESC;
 
--- View: Top 10 operadoras
+-- View: Top 10 operadoras (faixa do ranking pré-calculado)
 CREATE OR REPLACE VIEW vw_top_operadoras AS
 SELECT 
     razao_social,
@@ -143,10 +234,11 @@ SELECT
     total_despesas,
     media_trimestral,
     coeficiente_variacao,
-    RANK() OVER (ORDER BY total_despesas DESC) AS ranking
-FROM despesas_agregadas
-ORDER BY total_despesas DESC
-LIMIT 10;
+    posicao AS ranking
+FROM ranking_despesas
+WHERE metrica = 'total_despesas' AND dimensao = 'geral' AND particao = ''
+  AND posicao <= 10
+ORDER BY posicao;
 
 -- 5. FUNÇÕES ÚTEIS
 
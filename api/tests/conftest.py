@@ -0,0 +1,37 @@
+"""
+Fixtures compartilhadas dos testes
+
+Os testes cobrem as partes que rodam em processo (cache, paginação, cache
+HTTP, registro, admissão, hash dos checkpoints): nenhum precisa de banco.
+"""
+import pytest
+
+
+def criar_operadora(id: int, razao_social: str, **campos) -> dict:
+    """Linha de cadastro_operadoras como o registro em memória recebe"""
+    operadora = {
+        "id": id,
+        "registro_operadora": f"{300000 + id}",
+        "cnpj": f"{10000000000000 + id}",
+        "razao_social": razao_social,
+        "nome_fantasia": None,
+        "modalidade": "Cooperativa Médica",
+        "uf": "SP",
+        "cidade": "São Paulo",
+        "data_registro_ans": None,
+    }
+    operadora.update(campos)
+    return operadora
+
+
+@pytest.fixture
+def operadoras():
+    """Cadastro pequeno, já na ordem do banco (razao_social, id)"""
+    return [
+        criar_operadora(1, "ALFA SAÚDE LTDA", uf="MG", nome_fantasia="Alfa"),
+        criar_operadora(2, "BETA 100% ODONTO", modalidade="Odontologia de Grupo"),
+        criar_operadora(3, "BETA_SAUDE S.A.", uf="RJ"),
+        criar_operadora(4, "GAMA ASSISTÊNCIA MÉDICA", cidade="Belo Horizonte", uf="MG"),
+        criar_operadora(5, "UNIMED BELÉM", modalidade="Cooperativa Médica", uf="PA", cidade="Belém"),
+        criar_operadora(6, "UNIMED BELO HORIZONTE", uf="MG", cidade="Belo Horizonte"),
+    ]
@@ -0,0 +1,86 @@
+"""
+Controle de admissão: classe de cada rota e recusa com a fila cheia
+"""
+import asyncio
+
+import pytest
+
+from app.core.admissao import ControleAdmissao, LimiteConcorrencia, Sobrecarga, classificar
+
+
+@pytest.mark.parametrize(
+    "caminho, classe",
+    [
+        ("/api/buscar", "busca"),
+        ("/api/buscar/", "busca"),
+        ("/api/estatisticas", "agregacao"),
+        ("/api/despesas/serie", "agregacao"),
+        ("/api/exportar/despesas", "exportacao"),
+        ("/api/operadoras", "listagem"),
+        ("/api/operadoras/", "listagem"),
+        ("/api/operadoras/lote", "listagem"),
+        ("/api/ranking", "listagem"),
+        ("/api/operadoras/12345678000199/despesas", "listagem"),
+        ("/api/operadoras/12.345.678%2F0001-99/despesas/", "listagem"),
+        # Sem classe: continuam respondendo com o servidor sobrecarregado
+        ("/api/operadoras/12345678000199", None),
+        ("/api/operadoras/12345678000199/despesas/extra", None),
+        ("/health", None),
+        ("/metrics", None),
+        ("/docs", None),
+    ],
+)
+def test_classificar(caminho, classe):
+    assert classificar(caminho) == classe
+
+
+def test_controle_so_limita_classes_configuradas():
+    controle = ControleAdmissao({"busca": [2, 4]})
+
+    assert controle.limite("/api/buscar").nome == "busca"
+    assert controle.limite("/api/ranking") is None
+    assert controle.limite("/health") is None
+
+
+def test_limite_recusa_com_a_fila_cheia():
+    limite = LimiteConcorrencia("busca", concorrencia=1, fila=1, espera_max=1)
+
+    async def ocupar(liberar: asyncio.Event):
+        async with limite.entrar():
+            await liberar.wait()
+
+    async def cenario():
+        liberar = asyncio.Event()
+        em_execucao = asyncio.create_task(ocupar(liberar))
+        await asyncio.sleep(0)
+        na_fila = asyncio.create_task(ocupar(liberar))
+        await asyncio.sleep(0)
+
+        with pytest.raises(Sobrecarga) as recusa:
+            async with limite.entrar():
+                pass
+        estado = limite.estado()
+
+        liberar.set()
+        await asyncio.gather(em_execucao, na_fila)
+        return recusa.value.status_code, estado
+
+    status_code, estado = asyncio.run(cenario())
+
+    assert status_code == 429
+    assert estado == {"concorrencia": 1, "em_execucao": 1, "na_fila": 1, "recusadas": 1}
+    assert limite.estado()["em_execucao"] == 0
+
+
+def test_limite_responde_503_apos_esperar_demais():
+    limite = LimiteConcorrencia("exportacao", concorrencia=1, fila=1, espera_max=0.01)
+
+    async def cenario():
+        async with limite.entrar():
+            with pytest.raises(Sobrecarga) as recusa:
+                async with limite.entrar():
+                    pass
+        return recusa.value.status_code
+
+    assert asyncio.run(cenario()) == 503
+    assert limite.estado()["na_fila"] == 0
@@ -0,0 +1,224 @@
+"""
+Cache em memória (LRU + TTL + bytes) e single-flight de Cache.get_or_set
+"""
+import asyncio
+
+import pytest
+
+from app.core import cache as cache_mod
+from app.core.cache import Cache, LRUCache, MemoryBackend, chave_versionada
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Relógio monotônico controlado pelo teste"""
+
+    class Relogio:
+        agora = 1000.0
+
+        def avancar(self, segundos: float):
+            self.agora += segundos
+
+    relogio = Relogio()
+    monkeypatch.setattr(cache_mod.time, "monotonic", lambda: relogio.agora)
+    return relogio
+
+
+# ----------------------------
+# LRUCache
+# ----------------------------
+def test_lru_get_e_set():
+    lru = LRUCache()
+    lru.set("a", 1)
+
+    assert lru.get("a") == 1
+    assert lru.get("b") is None
+    assert len(lru) == 1
+
+
+def test_lru_expira_pelo_ttl(relogio):
+    lru = LRUCache()
+    lru.set("a", 1, ttl_seconds=10)
+
+    relogio.avancar(9.9)
+    assert lru.get("a") == 1
+
+    relogio.avancar(0.1)
+    assert lru.get("a") is None
+    assert len(lru) == 0
+    assert lru.stats()["expirations"] == 1
+
+
+def test_lru_remove_a_usada_ha_mais_tempo():
+    lru = LRUCache(max_entries=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")  # leitura renova "a"
+    lru.set("c", 3)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == 1 and lru.get("c") == 3
+    assert lru.stats()["evictions"] == 1
+
+
+def test_lru_regravar_nao_duplica_bytes():
+    lru = LRUCache(max_bytes=100)
+    lru.set("a", b"x" * 40)
+    lru.set("a", b"y" * 40)
+
+    assert lru.stats()["bytes"] == 40
+    assert lru.get("a") == b"y" * 40
+
+
+def test_lru_limite_de_bytes():
+    lru = LRUCache(max_bytes=100)
+    lru.set("a", b"x" * 40)
+    lru.set("b", b"x" * 40)
+    lru.set("c", b"x" * 40)
+
+    assert lru.get("a") is None
+    assert lru.stats()["bytes"] == 80
+
+    # Valor maior que o limite inteiro não é guardado (nem remove os outros)
+    lru.set("d", b"x" * 101)
+    assert lru.get("d") is None
+    assert len(lru) == 2
+
+
+def test_lru_tamanho_usa_nbytes():
+    class Corpo:
+        nbytes = 70
+
+    lru = LRUCache(max_bytes=100)
+    lru.set("a", Corpo())
+    lru.set("b", "ç" * 20)  # 40 bytes em UTF-8
+
+    assert lru.get("a") is None
+    assert lru.stats()["bytes"] == 40
+
+
+def test_lru_remover_sem_marcador():
+    lru = LRUCache()
+    lru.set(chave_versionada("lista", "v1", 1), 1)
+    lru.set(chave_versionada("lista", "v2", 1), 2)
+    lru.set(chave_versionada("stats", "v2"), 3)
+
+    assert lru.remover_sem(":v2:") == 1
+    assert lru.get("lista:v1:1") is None
+    assert lru.get("lista:v2:1") == 2
+    assert lru.stats()["bytes"] == cache_mod._tamanho(2) + cache_mod._tamanho(3)
+
+
+def test_lru_remover_expirados(relogio):
+    lru = LRUCache()
+    lru.set("curta", 1, ttl_seconds=5)
+    lru.set("longa", 2, ttl_seconds=60)
+
+    relogio.avancar(5)
+
+    assert lru.remover_expirados() == 1
+    assert len(lru) == 1
+    assert lru.stats() == {
+        "entries": 1,
+        "bytes": cache_mod._tamanho(2),
+        "evictions": 0,
+        "expirations": 1,
+    }
+
+
+# ----------------------------
+# Cache.get_or_set
+# ----------------------------
+def test_get_or_set_calcula_uma_vez_para_chamadas_concorrentes():
+    cache = Cache(MemoryBackend())
+    chamadas = 0
+
+    async def loader():
+        nonlocal chamadas
+        chamadas += 1
+        await asyncio.sleep(0.01)
+        return {"total": 42}
+
+    async def cenario():
+        resultados = await asyncio.gather(
+            *(cache.get_or_set("k", loader) for _ in range(10))
+        )
+        # Depois da carga, vem do backend
+        resultados.append(await cache.get_or_set("k", loader))
+        return resultados
+
+    resultados = asyncio.run(cenario())
+
+    assert chamadas == 1
+    assert all(r == {"total": 42} for r in resultados)
+    assert cache.stats()["hits"] == 1
+    assert cache._inflight == {}
+
+
+def test_get_or_set_repassa_a_excecao_e_nao_guarda():
+    cache = Cache(MemoryBackend())
+    chamadas = 0
+
+    async def falha():
+        nonlocal chamadas
+        chamadas += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("banco fora")
+
+    async def cenario():
+        return await asyncio.gather(
+            *(cache.get_or_set("k", falha) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    resultados = asyncio.run(cenario())
+
+    assert chamadas == 1
+    assert all(isinstance(r, RuntimeError) for r in resultados)
+    assert cache._inflight == {}
+
+    async def ok():
+        return 1
+
+    assert asyncio.run(cache.get_or_set("k", ok)) == 1
+
+
+def test_get_or_set_lider_cancelado_passa_a_vez():
+    cache = Cache(MemoryBackend())
+    inicio = []
+
+    async def loader():
+        inicio.append(len(inicio))
+        await asyncio.sleep(0.05 if len(inicio) == 1 else 0)
+        return f"carga {len(inicio)}"
+
+    async def cenario():
+        lider = asyncio.create_task(cache.get_or_set("k", loader))
+        await asyncio.sleep(0)
+        espera = asyncio.create_task(cache.get_or_set("k", loader))
+        await asyncio.sleep(0.01)
+
+        lider.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await lider
+        # Quem aguardava não herda o cancelamento: vira líder e recalcula
+        return await espera
+
+    assert asyncio.run(cenario()) == "carga 2"
+    assert len(inicio) == 2
+    assert cache._inflight == {}
+
+
+def test_descartar_versoes_roda_em_segundo_plano():
+    cache = Cache(MemoryBackend())
+
+    async def cenario():
+        await cache.set(chave_versionada("lista", "v1"), 1)
+        await cache.set(chave_versionada("lista", "v2"), 2)
+
+        await cache.descartar_versoes("v2")
+        antes = len(cache.backend.store)
+        await cache._descarte
+        return antes, len(cache.backend.store)
+
+    assert asyncio.run(cenario()) == (2, 1)
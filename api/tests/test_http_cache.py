@@ -0,0 +1,190 @@
+"""
+Cache HTTP condicional: validadores, precondições e a regra do 304 só no
+lugar de uma resposta 200
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from starlette.requests import Request
+from starlette.testclient import TestClient
+
+from app.api.registro import RegistroOperadoras
+from app.core.http_cache import (
+    formatar_http_date,
+    gerar_etag,
+    nao_modificado,
+    ultima_modificacao,
+)
+
+VERSAO = "2025-03-01T12:30:45.123456+00:00"
+CARGA = datetime(2025, 3, 1, 12, 30, 45, tzinfo=timezone.utc)
+
+
+def requisicao(caminho: str = "/api/operadoras", query: str = "", **headers) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "scheme": "http",
+            "server": ("teste", 80),
+            "path": caminho,
+            "query_string": query.encode(),
+            "headers": [
+                (nome.replace("_", "-").encode(), valor.encode())
+                for nome, valor in headers.items()
+            ],
+        }
+    )
+
+
+# ----------------------------
+# Validadores
+# ----------------------------
+def test_etag_estavel_por_url_e_versao():
+    etag = gerar_etag(VERSAO, requisicao(query="page=2"))
+
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert gerar_etag(VERSAO, requisicao(query="page=2")) == etag
+    assert gerar_etag(VERSAO, requisicao(query="page=3")) != etag
+    assert gerar_etag(VERSAO, requisicao("/api/estatisticas")) != etag
+    assert gerar_etag("2025-03-02T00:00:00+00:00", requisicao(query="page=2")) != etag
+
+
+@pytest.mark.parametrize(
+    "versao, esperado",
+    [
+        (VERSAO, CARGA),
+        ("2025-03-01T09:30:45.9-03:00", CARGA),
+        ("2025-03-01T12:30:45", None),  # sem fuso
+        ("0", None),  # sem carga
+    ],
+)
+def test_ultima_modificacao(versao, esperado):
+    assert ultima_modificacao(versao) == esperado
+
+
+# ----------------------------
+# Precondições
+# ----------------------------
+ETAG = 'W/"abc"'
+
+
+@pytest.mark.parametrize(
+    "if_none_match, esperado",
+    [
+        ('W/"abc"', True),
+        ('"abc"', True),  # comparação fraca
+        ('"xyz", W/"abc"', True),
+        ("*", True),
+        ('W/"xyz"', False),
+        ("", False),
+    ],
+)
+def test_if_none_match(if_none_match, esperado):
+    request = requisicao(if_none_match=if_none_match)
+
+    assert nao_modificado(request, ETAG, CARGA) is esperado
+
+
+@pytest.mark.parametrize(
+    "desde, esperado",
+    [
+        (CARGA, True),
+        (CARGA + timedelta(days=1), True),
+        (CARGA - timedelta(seconds=1), False),
+    ],
+)
+def test_if_modified_since(desde, esperado):
+    request = requisicao(if_modified_since=formatar_http_date(desde))
+
+    assert nao_modificado(request, ETAG, CARGA) is esperado
+
+
+def test_if_modified_since_invalido_ou_sem_carga():
+    assert nao_modificado(requisicao(if_modified_since="ontem"), ETAG, CARGA) is False
+    assert (
+        nao_modificado(requisicao(if_modified_since=formatar_http_date(CARGA)), ETAG, None)
+        is False
+    )
+
+
+def test_if_none_match_tem_precedencia():
+    request = requisicao(
+        if_none_match='W/"xyz"', if_modified_since=formatar_http_date(CARGA)
+    )
+
+    assert nao_modificado(request, ETAG, CARGA) is False
+
+
+# ----------------------------
+# Middleware: 304 só no lugar de uma 200
+# ----------------------------
+class DatasetFixo:
+    """Versão fixa do dataset, sem consultar o banco"""
+
+    observada = VERSAO
+
+    def ao_mudar(self, callback):
+        pass
+
+    async def atual(self, db):
+        return VERSAO
+
+
+@pytest.fixture
+def cliente(operadoras, monkeypatch):
+    from app import main
+
+    registro = RegistroOperadoras(operadoras, VERSAO)
+
+    async def sem_banco():
+        yield None
+
+    monkeypatch.setattr(main.app.state, "dataset", DatasetFixo(), raising=False)
+    main.app.dependency_overrides.update(
+        {
+            main.get_read_db: sem_banco,
+            main.get_dataset_versao: lambda: VERSAO,
+            main.get_registro: lambda: registro,
+        }
+    )
+    # Sem `with`: o lifespan (banco, cache, registro) não roda
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
+
+
+def test_304_com_validadores_e_vary(cliente, operadoras):
+    caminho = f"/api/operadoras/{operadoras[0]['cnpj']}"
+    primeira = cliente.get(caminho)
+    assert primeira.status_code == 200
+
+    response = cliente.get(caminho, headers={"If-None-Match": primeira.headers["etag"]})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == primeira.headers["etag"]
+    assert response.headers["last-modified"] == formatar_http_date(CARGA)
+    assert response.headers["cache-control"] == primeira.headers["cache-control"]
+    assert "accept-encoding" in response.headers["vary"].lower()
+
+
+def test_304_por_if_modified_since(cliente):
+    response = cliente.get(
+        "/api/operadoras", headers={"If-Modified-Since": formatar_http_date(CARGA)}
+    )
+
+    assert response.status_code == 304
+
+
+def test_recurso_inexistente_nao_vira_304(cliente):
+    response = cliente.get("/api/operadoras/00000000000000", headers={"If-None-Match": "*"})
+
+    assert response.status_code == 404
+    assert "etag" not in response.headers
+
+
+def test_parametro_invalido_nao_vira_304(cliente):
+    response = cliente.get("/api/operadoras?fields=xx", headers={"If-None-Match": "*"})
+
+    assert response.status_code == 400
+    assert "etag" not in response.headers
@@ -0,0 +1,132 @@
+"""
+Importação em blocos: hash do prefixo já importado (retomada depois de
+corrigir o arquivo) e classificação das linhas para a quarentena
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import import_data  # noqa: E402
+
+CABECALHO = "REG_ANS;CD_CONTA_CONTABIL;ANO;TRIMESTRE;VALOR_DESPESAS\n"
+
+
+def escrever_csv(caminho: Path, linhas):
+    caminho.write_text(CABECALHO + "".join(linhas), encoding="utf-8")
+    return str(caminho)
+
+
+@pytest.fixture
+def linhas():
+    return [f"3000{i:02d};411;2025;1;10,50\n" for i in range(23)]
+
+
+@pytest.fixture
+def chunk_size(monkeypatch):
+    def definir(tamanho):
+        monkeypatch.setitem(import_data.IMPORT_CONFIG, "chunk_size", tamanho)
+
+    definir(5)
+    return definir
+
+
+def hash_como_importacao(csv_path, ate):
+    """Hash acumulado bloco a bloco, como importar_arquivo grava no checkpoint"""
+    acumulado = import_data.HASH_VAZIO
+    processadas = 0
+    for chunk in import_data.ler_csv(csv_path):
+        if processadas >= ate:
+            break
+        import_data.numerar_linhas(chunk, processadas)
+        acumulado = import_data.acumular_hash(acumulado, chunk)
+        processadas += len(chunk)
+    return acumulado, processadas
+
+
+def test_hash_prefixo_confere_com_o_acumulado_nos_checkpoints(tmp_path, linhas, chunk_size):
+    csv_path = escrever_csv(tmp_path / "a.csv", linhas)
+    acumulado, processadas = hash_como_importacao(csv_path, 10)
+
+    assert processadas == 10
+    assert import_data.hash_prefixo(csv_path, processadas) == acumulado
+
+
+def test_hash_prefixo_nao_depende_do_tamanho_do_bloco(tmp_path, linhas, chunk_size):
+    csv_path = escrever_csv(tmp_path / "a.csv", linhas)
+    acumulado, _ = hash_como_importacao(csv_path, 15)
+
+    chunk_size(4)
+    assert import_data.hash_prefixo(csv_path, 15) == acumulado
+    chunk_size(100)
+    assert import_data.hash_prefixo(csv_path, 15) == acumulado
+
+
+def test_hash_prefixo_ignora_mudancas_depois_do_checkpoint(tmp_path, linhas, chunk_size):
+    original = import_data.hash_prefixo(escrever_csv(tmp_path / "a.csv", linhas), 10)
+
+    corrigidas = list(linhas)
+    corrigidas[12] = "300012;411;2025;2;99,00\n"
+    corrigidas.append("399999;411;2025;1;1,00\n")
+
+    assert import_data.hash_prefixo(escrever_csv(tmp_path / "b.csv", corrigidas), 10) == original
+
+
+@pytest.mark.parametrize(
+    "alterar",
+    [
+        lambda linhas: linhas.__setitem__(3, "300003;411;2025;1;10,51\n"),
+        lambda linhas: linhas.insert(0, linhas.pop(1)),  # mesma soma, outra ordem
+        lambda linhas: linhas.pop(0),
+    ],
+)
+def test_hash_prefixo_muda_com_o_prefixo(tmp_path, linhas, chunk_size, alterar):
+    original = import_data.hash_prefixo(escrever_csv(tmp_path / "a.csv", linhas), 10)
+
+    alteradas = list(linhas)
+    alterar(alteradas)
+
+    assert import_data.hash_prefixo(escrever_csv(tmp_path / "b.csv", alteradas), 10) != original
+
+
+def test_hash_prefixo_sem_linhas_processadas(tmp_path, linhas, chunk_size):
+    csv_path = escrever_csv(tmp_path / "a.csv", linhas)
+
+    assert import_data.hash_prefixo(csv_path, 0) == import_data.HASH_VAZIO
+
+
+def test_preparar_consolidado_classifica_rejeicoes():
+    bruto = pd.DataFrame(
+        {
+            "REG_ANS": ["300001", "", "300003", "300004", "300005", "300006", "300001"],
+            "CD_CONTA_CONTABIL": ["411", "411", "", "411", "411", "411", "411"],
+            "ANO": ["2025", "2025", "2025", "1999", "2025", "2025", "2025"],
+            "TRIMESTRE": ["1", "1", "1", "1", "5", "1", "1"],
+            "VALOR_DESPESAS": ["1.234,56", "1", "1", "1", "1", "0", "9"],
+        },
+        index=range(2, 9),
+    )
+
+    df, motivos = import_data.preparar_consolidado(bruto)
+
+    assert motivos.dropna().to_dict() == {
+        3: "reg_ans vazio",
+        4: "cd_conta_contabil vazio",
+        5: "ano inválido",
+        6: "trimestre inválido",
+    }
+    # Despesa zerada sai sem quarentena; a duplicata mantém a primeira linha
+    assert list(df.index) == [2]
+    assert df.loc[2, "valor_despesas"] == pytest.approx(1234.56)
+
+
+def test_motivo_onde_mantem_o_primeiro_motivo():
+    motivos = pd.Series([None, "anterior", None], dtype=object)
+    condicao = pd.Series([True, True, False])
+
+    resultado = import_data.motivo_onde(motivos, condicao, "novo")
+
+    assert resultado.tolist() == ["novo", "anterior", None]
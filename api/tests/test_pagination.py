@@ -0,0 +1,100 @@
+"""
+Cursor keyset de /api/operadoras: codificação e bordas da página
+"""
+import base64
+import json
+
+import pytest
+
+from app.core.pagination import (
+    NEXT,
+    PREV,
+    CursorInvalido,
+    cursores_da_pagina,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+@pytest.mark.parametrize(
+    "razao_social, id, direcao",
+    [
+        ("ALFA SAÚDE LTDA", 1, NEXT),
+        ("UNIMED BELÉM", 123456, PREV),
+        ("", 0, NEXT),
+        ('ASPAS "E" BARRAS \\ /', 7, PREV),
+    ],
+)
+def test_cursor_ida_e_volta(razao_social, id, direcao):
+    cursor = encode_cursor(razao_social, id, direcao)
+
+    assert decode_cursor(cursor) == (razao_social, id, direcao)
+
+
+def test_cursor_e_opaco_e_seguro_para_url():
+    cursor = encode_cursor("ÇÃO / + ?", 42, NEXT)
+
+    assert "=" not in cursor
+    assert set(cursor) <= set(
+        "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+    )
+
+
+def _cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "não-é-base64!",
+        base64.urlsafe_b64encode(b"{nao json").decode(),
+        _cursor(["ALFA", 1]),
+        _cursor(["ALFA", 1, "x"]),
+        _cursor(["ALFA", "1", NEXT]),
+        _cursor([1, 1, NEXT]),
+        _cursor({"razao_social": "ALFA", "id": 1, "direcao": NEXT}),
+    ],
+)
+def test_cursor_invalido(cursor):
+    with pytest.raises(CursorInvalido):
+        decode_cursor(cursor)
+
+
+def test_cursor_invalido_e_value_error():
+    # As rotas tratam CursorInvalido como 400 junto com os demais ValueError
+    assert issubclass(CursorInvalido, ValueError)
+
+
+def test_cursores_da_pagina_usam_as_bordas():
+    itens = [
+        {"razao_social": "ALFA", "id": 1},
+        {"razao_social": "BETA", "id": 2},
+        {"razao_social": "GAMA", "id": 3},
+    ]
+
+    proximo, anterior = cursores_da_pagina(itens, has_next=True, has_prev=True)
+
+    assert decode_cursor(proximo) == ("GAMA", 3, NEXT)
+    assert decode_cursor(anterior) == ("ALFA", 1, PREV)
+
+
+def test_cursores_da_pagina_so_existem_quando_ha_pagina():
+    itens = [{"razao_social": "ALFA", "id": 1}]
+
+    assert cursores_da_pagina(itens, has_next=False, has_prev=False) == (None, None)
+    assert cursores_da_pagina([], has_next=True, has_prev=True) == (None, None)
+
+    proximo, anterior = cursores_da_pagina(itens, has_next=True, has_prev=False)
+    assert proximo is not None and anterior is None
+
+
+def test_cursores_da_pagina_aceitam_objetos():
+    class Linha:
+        razao_social = "DELTA"
+        id = 9
+
+    proximo, _ = cursores_da_pagina([Linha()], has_next=True, has_prev=False)
+
+    assert decode_cursor(proximo) == ("DELTA", 9, NEXT)
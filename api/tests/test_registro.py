@@ -0,0 +1,175 @@
+"""
+Registro de operadoras em memória: filtros, paginação por página e por
+cursor, busca e detalhe
+"""
+import json
+
+import pytest
+
+from app.api.registro import GerenciadorRegistro, RegistroOperadoras
+from app.core.pagination import NEXT, PREV
+
+
+@pytest.fixture
+def registro(operadoras):
+    return RegistroOperadoras(operadoras, "v1")
+
+
+def ids(itens):
+    return [operadora["id"] for operadora in itens]
+
+
+def listar(registro, razao_social=None, uf=None, modalidade=None, page=1, limit=10, cursor=None):
+    return registro.listar(razao_social, uf, modalidade, page, limit, cursor)
+
+
+def cursor_de(registro, id, direcao):
+    posicao = registro.posicao_por_id[id]
+    return (registro.operadoras[posicao]["razao_social"], id, direcao)
+
+
+# ----------------------------
+# Filtros
+# ----------------------------
+@pytest.mark.parametrize(
+    "filtros, esperados",
+    [
+        ({}, [1, 2, 3, 4, 5, 6]),
+        ({"uf": "mg"}, [1, 4, 6]),
+        ({"modalidade": "odonto"}, [2]),
+        ({"modalidade": "COOPERATIVA"}, [1, 3, 4, 5, 6]),
+        ({"uf": "MG", "modalidade": "cooperativa"}, [1, 4, 6]),
+        ({"razao_social": "unimed"}, [5, 6]),
+        ({"razao_social": "unimed", "uf": "PA"}, [5]),
+        ({"uf": "AC"}, []),
+    ],
+)
+def test_listar_filtros(registro, filtros, esperados):
+    pagina = listar(registro, **filtros)
+
+    assert ids(pagina.itens) == esperados
+    assert pagina.total == len(esperados)
+
+
+@pytest.mark.parametrize("termo, esperados", [("100%", [2]), ("a_s", [3]), ("%", [2]), ("_", [3])])
+def test_listar_razao_social_trata_curingas_como_texto(registro, termo, esperados):
+    # Mesmo comportamento do ILIKE com % e _ escapados
+    assert ids(listar(registro, razao_social=termo).itens) == esperados
+
+
+# ----------------------------
+# Paginação
+# ----------------------------
+@pytest.mark.parametrize(
+    "page, esperados, has_next, has_prev",
+    [
+        (1, [1, 2], True, False),
+        (2, [3, 4], True, True),
+        (3, [5, 6], False, True),
+        (4, [], False, True),
+    ],
+)
+def test_listar_por_pagina(registro, page, esperados, has_next, has_prev):
+    pagina = listar(registro, page=page, limit=2)
+
+    assert ids(pagina.itens) == esperados
+    assert (pagina.total, pagina.has_next, pagina.has_prev) == (6, has_next, has_prev)
+
+
+@pytest.mark.parametrize(
+    "id, direcao, esperados, has_next, has_prev",
+    [
+        (2, NEXT, [3, 4], True, True),
+        (4, NEXT, [5, 6], False, True),
+        (6, NEXT, [], False, True),
+        (5, PREV, [3, 4], True, True),
+        (3, PREV, [1, 2], True, False),
+        (1, PREV, [], True, False),
+    ],
+)
+def test_listar_por_cursor(registro, id, direcao, esperados, has_next, has_prev):
+    pagina = listar(registro, limit=2, cursor=cursor_de(registro, id, direcao))
+
+    assert ids(pagina.itens) == esperados
+    assert (pagina.has_next, pagina.has_prev) == (has_next, has_prev)
+
+
+def test_listar_por_cursor_com_filtro(registro):
+    # A borda (id 2, SP) não está no filtro de MG: continua depois dela
+    pagina = listar(registro, uf="MG", limit=1, cursor=cursor_de(registro, 2, NEXT))
+
+    assert ids(pagina.itens) == [4]
+    assert (pagina.total, pagina.has_next) == (3, True)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [("ALFA SAÚDE LTDA", 99, NEXT), ("OUTRA RAZÃO", 1, NEXT)],
+)
+def test_listar_cursor_fora_do_snapshot_vai_ao_banco(registro, cursor):
+    assert listar(registro, cursor=cursor) is None
+
+
+# ----------------------------
+# Busca e detalhe
+# ----------------------------
+def test_buscar_sem_acentos_e_por_prefixo(registro):
+    resultados = registro.buscar("unimed bel", 10)
+
+    assert sorted(ids(op for op, _ in resultados)) == [5, 6]
+    assert ids(op for op, _ in registro.buscar("ASSISTENCIA medica", 10)) == [4]
+    # A cidade também entra no documento da busca
+    assert 4 in ids(op for op, _ in registro.buscar("belo horizonte", 10))
+
+
+def test_buscar_ordena_por_relevancia_e_limita(registro):
+    resultados = registro.buscar("beta", 1)
+
+    assert len(resultados) == 1
+    assert resultados[0][0]["id"] in (2, 3)
+    assert resultados[0][1] == pytest.approx(1.5)
+
+
+def test_buscar_por_prefixo_de_cnpj(registro, operadoras):
+    cnpj = operadoras[4]["cnpj"]
+
+    resultados = registro.buscar(f"{cnpj[:2]}.{cnpj[2:]}", 10)
+
+    # Nenhuma palavra casa; a relevância vem só do CNPJ
+    assert ids(op for op, _ in resultados) == [5]
+    assert resultados[0][1] == pytest.approx(1.0)
+
+
+def test_buscar_sem_resultado(registro):
+    assert registro.buscar("inexistente", 10) == []
+
+
+def test_detalhe_json(registro, operadoras):
+    cnpj = operadoras[0]["cnpj"]
+    corpo = registro.detalhe_json(cnpj)
+
+    assert json.loads(corpo)["razao_social"] == "ALFA SAÚDE LTDA"
+    assert registro.detalhe_json(cnpj) is corpo
+    assert registro.detalhe_json("00000000000000") is None
+
+
+# ----------------------------
+# Gerenciador
+# ----------------------------
+class DatasetFalso:
+    observada = None
+
+
+def test_vigente_so_com_a_versao_observada(registro):
+    dataset = DatasetFalso()
+    gerenciador = GerenciadorRegistro(dataset)
+
+    assert gerenciador.vigente() is None
+
+    gerenciador.atual = registro
+    dataset.observada = "v1"
+    assert gerenciador.vigente() is registro
+
+    # Versão nova observada, recarga ainda não terminou: rotas vão ao banco
+    dataset.observada = "v2"
+    assert gerenciador.vigente() is None
@@ -106,8 +106,13 @@ def realize_join_ans(
     return df_result
 
 
+# Chave de agregação: REG_ANS identifica a operadora; razão social e UF
+# seguem no resultado para exibição
+AGGREGATE_KEYS = ["REG_ANS", "Razao_Social", "UF"]
+
+
 def aggregate(csv_file):
-    df = pd.read_csv(csv_file, sep=";")
+    df = pd.read_csv(csv_file, sep=";", dtype={"REG_ANS": str})
 
     # Explicitly ensure VALOR_DESPESAS is numeric
     df["VALOR_DESPESAS"] = pd.to_numeric(df["VALOR_DESPESAS"], errors="coerce")
@@ -126,8 +131,8 @@ def aggregate(csv_file):
     # Filter to keep only the most granular accounts
     df_filtered = df[df["CD_CONTA_CONTABIL"].str.len() == max_len].copy()
 
-    print("\nAgrupando por RazaoSocial e UF...")
-    groups = df_filtered.groupby(["Razao_Social", "UF"])
+    print("\nAgrupando por REG_ANS (RazaoSocial e UF)...")
+    groups = df_filtered.groupby(AGGREGATE_KEYS)
 
     print("Calculando total de despesas...")
     total_operator = groups["VALOR_DESPESAS"].sum().reset_index()
@@ -136,13 +141,13 @@ def aggregate(csv_file):
     print("Calculando média por trimestre...")
 
     total_trimester = (
-        df_filtered.groupby(["Razao_Social", "UF", "TRIMESTRE"])["VALOR_DESPESAS"]
+        df_filtered.groupby(AGGREGATE_KEYS + ["TRIMESTRE"])["VALOR_DESPESAS"]
         .sum()
         .reset_index()
     )
 
     media_trimester = (
-        total_trimester.groupby(["Razao_Social", "UF"])["VALOR_DESPESAS"]
+        total_trimester.groupby(AGGREGATE_KEYS)["VALOR_DESPESAS"]
         .mean()
         .reset_index()
     )
@@ -156,8 +161,8 @@ def aggregate(csv_file):
     desvio_padrao = desvio_padrao.rename(columns={"VALOR_DESPESAS": "DESVIO_PADRAO"})
 
     print("Consolidando resultados...")
-    result = pd.merge(total_operator, media_trimester, on=["Razao_Social", "UF"])
-    result = pd.merge(result, desvio_padrao, on=["Razao_Social", "UF"])
+    result = pd.merge(total_operator, media_trimester, on=AGGREGATE_KEYS)
+    result = pd.merge(result, desvio_padrao, on=AGGREGATE_KEYS)
 
     # Round monetary values to 2 decimal places for presentation
     result["TOTAL_DESPESAS"] = result["TOTAL_DESPESAS"].round(2)
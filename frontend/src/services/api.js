@@ -23,13 +23,8 @@ api.interceptors.request.use(
       config.headers.Authorization = `Bearer ${token}`;
     }
 
-    // Adicionar timestamp para evitar cache
-    if (config.method === "get") {
-      config.params = {
-        ...config.params,
-        _t: Date.now(),
-      };
-    }
+    // Sem cache-buster: a API responde com ETag/Last-Modified e 304
+    // quando os dados não mudaram desde a última carga
 
     console.log(`[API Request] ${config.method.toUpperCase()} ${config.url}`);
     return config;